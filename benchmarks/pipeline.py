@@ -0,0 +1,254 @@
+"""Time every stage of the tier pipeline on synthetic surveys.
+
+Run from the repository root::
+
+    python -m benchmarks.pipeline [--sizes 1000 10000 ...] [--output FILE]
+
+Synthetic ``Main_dataset.csv``, section I and section L frames are drawn for
+each number of households (10^3 to 10^6 by default, up to 10^7 with
+``--sizes``): about half of the answers are blank, hours and outages mix
+numbers with "Don't know" and 888, and households own one to three stoves.
+Each stage is timed once, then run again under ``tracemalloc`` for its peak
+allocated memory.  Results go to a JSON file together with the commit and
+library versions, so runs on different commits can be compared.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mtf.appliances import appliance_tiers, read_appliance_tiers
+from mtf.capacity import CAPACITY_COLUMNS, total_capacity
+from mtf.cooking import PLACE_COLUMN, StoveLinkage, emission_tiers
+from mtf.data import main_dataset
+from mtf.electricity import (ATTRIBUTE_COLUMNS, ATTRIBUTES,
+                             DAY_AVAILABILITY_COLUMNS,
+                             EVENING_AVAILABILITY_COLUMNS, FORMALITY_COLUMN,
+                             FORMALITY_TIERS, HEALTH_SAFETY_COLUMN,
+                             HEALTH_SAFETY_TIERS, QUALITY_COLUMN,
+                             QUALITY_TIERS, household_reliability, mtf_tier,
+                             reliability_by_source)
+from mtf.index import access_index_bounds, bootstrap_access_index
+from mtf.matrix import tier_matrix
+from mtf.model import numeric_answers
+from mtf.sources import coalesce_months, pair_columns, sum_sources
+from mtf.tiers import (CAPACITY_TIERS, DAY_AVAILABILITY_TIERS,
+                       EVENING_AVAILABILITY_TIERS)
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+#: Share of blank answers.
+BLANK = 0.5
+
+#: Answers of the Yes/No questions and of the bill question (C17).
+YES_NO = ['Yes', 'No', "Don't know"]
+BILLS = ['Pay based on lights and appliances used', 'Fixed monthly fee',
+         'No bill for electricity', 'We never used electricity']
+
+#: Primary fuels (I18A, section I) and places of cooking (I14, asked once
+#: per household in the main dataset).
+FUEL_CODES = [1, 4, 5, 6, 8, 12, 14, 15, 17, 555]
+PLACES = [1, 2, 3, 4, 5]
+
+
+def _blank(rng, values):
+    values = pd.Series(values, dtype=object)
+    values[rng.random(len(values)) < BLANK] = np.nan
+    return pd.Categorical(values)
+
+
+def _mixed(rng, households, high):
+    """Numbers with some "Don't know" and 888 answers, as categoricals."""
+    values = rng.integers(0, high + 1, households).astype(object)
+    special = rng.random(households)
+    values[special < 0.03] = "Don't know"
+    values[(special >= 0.03) & (special < 0.05)] = 888
+    return _blank(rng, values)
+
+
+def synthetic_main_dataset(households, seed=0):
+    """Section C answers shaped like ``Main_dataset.csv``."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for column in CAPACITY_COLUMNS:
+        values = rng.lognormal(3, 1.2, households)
+        values[rng.random(households) < 0.8] = np.nan
+        columns[column] = values
+    for column in pair_columns(DAY_AVAILABILITY_COLUMNS):
+        columns[column] = _mixed(rng, households, 24)
+    for column in pair_columns(EVENING_AVAILABILITY_COLUMNS):
+        columns[column] = _mixed(rng, households, 4)
+    for column in ATTRIBUTE_COLUMNS['Reliability']:
+        columns[column] = _mixed(rng, households, 20)
+    for column in (QUALITY_COLUMN, HEALTH_SAFETY_COLUMN):
+        columns[column] = _blank(rng, rng.choice(YES_NO, households))
+    columns[FORMALITY_COLUMN] = _blank(rng, rng.choice(BILLS, households))
+    columns[PLACE_COLUMN] = _blank(rng, rng.choice(PLACES, households))
+    columns['HHID'] = np.arange(households, dtype=np.int64) + 1
+    return pd.DataFrame(columns)
+
+
+def synthetic_section_i(households, seed=0):
+    """One to three stoves per household, the first one primary."""
+    rng = np.random.default_rng(seed + 1)
+    stoves = rng.integers(1, 4, households)
+    hhid = np.repeat(np.arange(households, dtype=np.int64) + 1, stoves)
+    first = np.r_[True, hhid[1:] != hhid[:-1]]
+    return pd.DataFrame({
+        'HHID': hhid,
+        'I2': rng.integers(1, 12, len(hhid)),
+        'I3': np.where(first, 1, 2),
+        'I18A': rng.choice(FUEL_CODES, len(hhid)).astype(float),
+    })
+
+
+def synthetic_section_l(households, seed=0):
+    """Appliance items 33 to 73 with the number owned (La)."""
+    rng = np.random.default_rng(seed + 2)
+    items = rng.integers(0, 6, households)
+    hhid = np.repeat(np.arange(households, dtype=np.int64) + 1, items)
+    amounts = rng.integers(0, 4, len(hhid)).astype(float)
+    amounts[rng.random(len(hhid)) < 0.1] = np.nan
+    return pd.DataFrame({'HHID': hhid,
+                         'Item': rng.integers(33, 74, len(hhid)),
+                         'La': amounts})
+
+
+def stages(households, directory, seed=0):
+    """Return the (name, function) of every stage, in pipeline order.
+
+    Stages pass their results on through a shared dict.
+    """
+    main = synthetic_main_dataset(households, seed)
+    section_i = synthetic_section_i(households, seed)
+    section_l = synthetic_section_l(households, seed)
+    path = Path(directory) / 'Main_dataset.csv'
+    main.to_csv(path)
+    lookup = read_appliance_tiers()
+    state = {}
+
+    def load():
+        dataset = main_dataset(path)
+        state['data'] = dataset.load(dataset.columns)
+
+    def capacity():
+        state['Capacity'] = CAPACITY_TIERS.classify(total_capacity(main))
+
+    def availability():
+        hours = numeric_answers(main, pair_columns(DAY_AVAILABILITY_COLUMNS)
+                                + pair_columns(EVENING_AVAILABILITY_COLUMNS),
+                                dont_know=0, dtype='float64')
+        state['Availability'] = DAY_AVAILABILITY_TIERS.classify(
+            sum_sources(coalesce_months(hours, DAY_AVAILABILITY_COLUMNS)))
+        state['Evening_Availability'] = EVENING_AVAILABILITY_TIERS.classify(
+            sum_sources(coalesce_months(hours,
+                                        EVENING_AVAILABILITY_COLUMNS)))
+
+    def reliability():
+        outages = numeric_answers(main, ATTRIBUTE_COLUMNS['Reliability'],
+                                  dtype='float64')
+        state['Reliability'] = household_reliability(
+            reliability_by_source(outages))
+
+    def quality_formality_safety():
+        state['Quality'] = QUALITY_TIERS.classify(main[QUALITY_COLUMN])
+        state['Formality'] = FORMALITY_TIERS.classify(main[FORMALITY_COLUMN])
+        state['Health_Safety'] = HEALTH_SAFETY_TIERS.classify(
+            main[HEALTH_SAFETY_COLUMN])
+
+    def cooking_emission():
+        fuel = StoveLinkage(main['HHID'], section_i).primary_fuel
+        place = pd.to_numeric(main[PLACE_COLUMN], errors='coerce')
+        state['Emission'] = emission_tiers(fuel, place)
+
+    def appliances():
+        state['Appliances'] = appliance_tiers(main['HHID'], section_l, lookup)
+
+    def aggregation():
+        tiers = pd.DataFrame({attribute: np.asarray(state[attribute])
+                              for attribute in ATTRIBUTES}).astype('category')
+        tiers['MTF'] = mtf_tier(tiers).array
+        state['tiers'] = tiers
+        state['matrix'] = tier_matrix(tiers)
+
+    def index():
+        tiers = state['tiers'][ATTRIBUTES]
+        state['bounds'] = access_index_bounds(tiers)
+        state['bootstrap'] = bootstrap_access_index(tiers, replicates=1000,
+                                                    seed=seed)
+
+    return [(function.__name__, function)
+            for function in (load, capacity, availability, reliability,
+                             quality_formality_safety, cooking_emission,
+                             appliances, aggregation, index)]
+
+
+def measure(function):
+    """Wall time of ``function`` and its peak allocated memory (bytes)."""
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], check=True,
+                              capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=SIZES, seed=0):
+    """Benchmark every stage for every number of households."""
+    results = []
+    for households in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            for stage, function in stages(households, directory, seed):
+                seconds, peak = measure(function)
+                results.append({'households': households, 'stage': stage,
+                                'seconds': seconds, 'peak_bytes': peak})
+                print('%9d  %-26s %9.3f s %10.1f MB'
+                      % (households, stage, seconds, peak / 2 ** 20))
+    return {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'seed': seed,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.pipeline',
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='numbers of households (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path,
+                        default=Path('benchmark-pipeline.json'),
+                        help='JSON results (default: %(default)s)')
+    args = parser.parse_args(argv)
+    report = run(args.sizes, args.seed)
+    args.output.write_text(json.dumps(report, indent=1))
+    print(args.output)
+
+
+if __name__ == '__main__':
+    main()
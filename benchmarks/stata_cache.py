@@ -0,0 +1,41 @@
+"""Cold and warm load times of the raw Stata sections.
+
+Run from the repository root::
+
+    python -m benchmarks.stata_cache
+
+The cold load reads the ``.dta`` file and writes the cache, the warm load
+memory-maps the cache; both are compared with ``pd.read_stata``.
+"""
+
+import shutil
+import time
+
+import pandas as pd
+
+from mtf.data import CACHE_DIR, RAW_SECTIONS, READ_OPTIONS, read_stata
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    print('%-36s %10s %10s %10s' % ('section', 'read_stata', 'cold', 'warm'))
+    for country, sections in RAW_SECTIONS.items():
+        for section, path in sections.items():
+            if not path.exists():
+                continue
+            options = READ_OPTIONS.get((country, section), {})
+            shutil.rmtree(path.parent / CACHE_DIR, ignore_errors=True)
+            baseline = timed(pd.read_stata, path, **options)
+            cold = timed(read_stata, path, **options)
+            warm = timed(read_stata, path, **options)
+            name = '%s/%s' % (country, path.name)
+            print('%-36s %9.3fs %9.3fs %9.3fs' % (name, baseline, cold, warm))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Compare the threshold-table classifier with the notebooks' np.vectorize.
+
+Run from the repository root::
+
+    python -m benchmarks.tier_classifier [rows]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from mtf.model import memory_per_household
+from mtf.tiers import CAPACITY_TIERS, MISSING
+
+
+def conditions(Total_Capacity):
+    # Copy of the capacity rule of Rwanda_MTF_Electricity.ipynb
+    if Total_Capacity == MISSING:
+        return MISSING
+    elif Total_Capacity < 12:
+        return "0"
+    elif 12 <= Total_Capacity < 200:
+        return "1"
+    elif 200 <= Total_Capacity < 1000:
+        return "2"
+    elif 1000 <= Total_Capacity < 3400:
+        return "3"
+    elif 3400 <= Total_Capacity < 8200:
+        return "4"
+    else:
+        return "5"
+
+
+def synthetic_capacity(rows, seed=0):
+    """Log-normal Wh/day values with about half of the households missing."""
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(mean=5.5, sigma=1.5, size=rows)
+    values[rng.random(rows) < 0.5] = np.nan
+    return pd.Series(values, name='Total_Capacity')
+
+
+def main(rows=1000000):
+    capacity = synthetic_capacity(rows)
+    legacy_input = capacity.astype(object).where(capacity.notna(), MISSING)
+
+    start = time.perf_counter()
+    legacy = np.vectorize(conditions)(legacy_input)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tiers = CAPACITY_TIERS.classify(capacity)
+    table_time = time.perf_counter() - start
+
+    assert (tiers.astype(str).to_numpy() == legacy).all()
+    legacy_frame = pd.DataFrame({'Total_Capacity': legacy_input,
+                                 'TIER_cap': legacy})
+    typed_frame = pd.DataFrame({'Total_Capacity': capacity.astype('Float64'),
+                                'TIER_cap': tiers})
+    print('rows            %d' % rows)
+    print('np.vectorize    %.3f s  %6.1f B/household'
+          % (legacy_time, memory_per_household(legacy_frame)))
+    print('TierTable       %.3f s  %6.1f B/household'
+          % (table_time, memory_per_household(typed_frame)))
+    print('speed-up        %.0fx' % (legacy_time / table_time))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,34 @@
+"""Multi-Tier Framework (MTF) energy access analysis.
+
+Reusable, vectorised building blocks behind the Rwanda and Ethiopia
+notebooks.  The notebooks keep the narrative and the figures; the tier
+computations live here so that they can run on full survey rounds.
+"""
+
+from .capacity import (CAPACITY_COLUMNS, ETHIOPIA_CAPACITY_COLUMNS,
+                       total_capacity)
+from .sources import (coalesce_months, combine_sources, pair_columns,
+                      primary_source, source_matrix, sum_sources)
+from .tiers import (CAPACITY_TIERS, COOKING_CONVENIENCE_TIERS,
+                    DAY_AVAILABILITY_TIERS, EVENING_AVAILABILITY_TIERS,
+                    MISSING, TIERS, CodeTable, OutageTable, TierTable,
+                    classify, tier_floor, tier_range)
+from .model import numeric_answers, tier_dtype, without_missing
+from .electricity import (ATTRIBUTE_COLUMNS, ATTRIBUTES, electricity_tiers,
+                          seasonal_tiers)
+from .data import (Dataset, converted_section, main_dataset, main_households,
+                   read_section)
+from .cooking import StoveLinkage, cooking_tiers, emission_tiers
+from .appliances import appliance_inventory, appliance_tiers
+from .index import (access_index, access_index_bounds,
+                    bootstrap_access_index)
+from .survey import geography, household_weights, weighted_shares
+from .rulebook import Rulebook, evaluate, load_rulebook
+from .countries import CountryProfile, compare_countries, country_tiers
+from .matrix import tier_matrix
+from .stream import TierAccumulator, stream_tiers, summarise
+from .profiling import profiled
+from .weights import (WeightIndex, attach_weights, check_weights,
+                      load_weights)
+from .roster import household_features, join_features
+from .solar import solar_sources
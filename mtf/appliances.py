@@ -0,0 +1,93 @@
+"""Capacity tier from the appliances owned by the household (section L).
+
+Each appliance of section L (item codes 33 to 73) needs at least a given
+capacity tier, listed in ``appliances_for_tiers.txt`` after table 1 of the
+Rwanda report.  A household is in the highest tier of the appliances it
+owns, tier 0 when it owns none of them.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .data import ROOT
+from .profiling import instrumented
+from .tiers import TIERS
+
+#: "<tier> <item code> <name>" on every line.
+APPLIANCE_TIERS_FILE = ROOT / 'Rwanda' / 'appliances_for_tiers.txt'
+
+
+def read_appliance_tiers(path=APPLIANCE_TIERS_FILE):
+    """Return the tier of every item code as an int8 lookup array.
+
+    ``lookup[code]`` is the tier of the appliance ``code``, -1 for codes
+    that are not appliances.
+    """
+    mapping = {}
+    with open(path) as stream:
+        for line in stream:
+            if line.strip():
+                tier, code = line.split()[:2]
+                mapping[int(code)] = int(tier)
+    lookup = np.full(max(mapping) + 1, -1, dtype=np.int8)
+    lookup[list(mapping)] = list(mapping.values())
+    return lookup
+
+
+def _owned(section_l, household, item, amount):
+    """Rows of section L for appliances the household actually owns."""
+    amounts = pd.to_numeric(section_l[amount], errors='coerce')
+    return section_l.loc[amounts > 0, [household, item, amount]]
+
+
+@instrumented('tiering')
+def appliance_tiers(households, section_l, lookup=None, household='HHID',
+                    item='Item', amount='La'):
+    """Return the appliance-based capacity tier of every household.
+
+    Parameters
+    ----------
+    households : pandas.Series
+        HHID of every household.
+    section_l : pandas.DataFrame
+        Section L, one row per household and item.
+    lookup : numpy.ndarray, optional
+        Tier of every item code, :func:`read_appliance_tiers` by default.
+    household, item, amount : str
+        HHID, item code and number owned (La) columns of section L.
+
+    Returns
+    -------
+    pandas.Series
+        Categorical tiers indexed like ``households``.
+    """
+    if lookup is None:
+        lookup = read_appliance_tiers()
+    owned = _owned(section_l, household, item, amount)
+    codes = pd.to_numeric(owned[item], errors='coerce').to_numpy()
+    known = (codes >= 0) & (codes < len(lookup))
+    tiers = np.full(len(codes), -1, dtype=np.int8)
+    tiers[known] = lookup[codes[known].astype(np.intp)]
+    highest = pd.Series(tiers, index=owned[household].to_numpy()).groupby(
+        level=0).max()
+    capacity = households.map(highest).fillna(0).clip(lower=0)
+    return TIERS.classify(pd.Series(capacity.to_numpy(dtype=float),
+                                    index=households.index,
+                                    name='Appliance_Capacity'))
+
+
+def appliance_inventory(households, section_l, household='HHID', item='Item',
+                        amount='La'):
+    """Items and amounts owned by every household, as lists.
+
+    Same frame as the one exported to ``appliances_dataset.xlsx``.
+    """
+    owned = _owned(section_l, household, item, amount)
+    grouped = owned.groupby(household, sort=False)
+    columns = {'items': grouped[item].agg(list),
+               'amount': grouped[amount].agg(list)}
+    return pd.DataFrame({
+        name: [value if isinstance(value, list) else []
+               for value in households.map(lists)]
+        for name, lists in columns.items()
+    }, index=households.index)
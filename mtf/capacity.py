@@ -0,0 +1,54 @@
+"""Attribute: Capacity.
+
+The survey asks how many kWh each source supplied in the last month.  The MTF
+thresholds are expressed in daily Wh, so the total over all sources is
+converted with ``kWh * 1000 / 30``.
+"""
+
+import pandas as pd
+
+from .sources import combine_sources, source_matrix
+
+#: Monthly kWh per electricity source in the Rwanda questionnaire.
+CAPACITY_COLUMNS = {
+    'C22': 'National_Grid',
+    'C64': 'Mini_Grid',
+    'C88': 'Generator',
+    'C117': 'Inverter',
+    'C119A': 'Battery',
+}
+
+#: Same questions in the Ethiopia questionnaire.
+ETHIOPIA_CAPACITY_COLUMNS = {
+    'C21': 'National_Grid',
+    'C58': 'Mini_Grid',
+}
+
+
+def total_capacity(df, columns=CAPACITY_COLUMNS, zero_as_missing=True,
+                   policy='sum', primary=None):
+    """Return the daily capacity (Wh) of every household in ``df``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Survey data with one row per household.
+    columns : iterable of str
+        Monthly kWh columns to add up, one per source.
+    zero_as_missing : bool
+        Treat a total of 0 kWh as missing, as the Rwanda analysis does.
+    policy : str
+        How the sources combine, see :func:`~mtf.sources.combine_sources`.
+    primary : numpy.ndarray, optional
+        Column of the primary source of every household, for the
+        ``'primary'`` policy.
+
+    Returns
+    -------
+    pandas.Series
+        ``Total_Capacity`` in Wh/day, NaN where no source was reported.
+    """
+    total = combine_sources(source_matrix(df, columns), policy, primary)
+    if zero_as_missing:
+        total[total == 0] = float('nan')
+    return pd.Series(total * 1000 / 30, index=df.index, name='Total_Capacity')
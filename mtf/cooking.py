@@ -0,0 +1,225 @@
+"""Cooking: linking households to the stoves of section I.
+
+Section I has one row per stove and household.  The notebooks filtered it
+once per household (``primary_stoves.loc[section_I["HHID"] == hhid]``),
+which is quadratic in the number of households.  :class:`StoveLinkage`
+keeps the primary stoves once and joins them to the households on HHID.
+
+:func:`cooking_tiers` tiers the attributes of the cooking notebook from the
+answers of the primary stove of every household.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .profiling import instrumented
+from .tiers import COOKING_CONVENIENCE_TIERS, MISSING, CodeTable
+from .weights import check_weights
+
+#: Fuel codes of question I18A.
+FUELS = {
+    1: 'Kerosene',
+    2: 'Coal/lignite',
+    3: 'Peat',
+    4: 'Charcoal',
+    5: 'Wood',
+    6: 'Solar',
+    7: 'Animal Waste/Dung',
+    8: 'Crop Residue/Plant Biomass',
+    9: 'Saw Dust',
+    10: 'Coal Briquette',
+    11: 'Biomass Briquette',
+    12: 'Processed biomass (pellets/woodchips)',
+    13: 'Ethanol',
+    14: 'Biogas',
+    15: 'LPG',
+    16: 'Piped Natural Gas',
+    17: 'Electric',
+    18: 'Garbage/plastic',
+    555: 'Other',
+}
+
+#: Fuels reported as primary fuel in the Rwanda survey.
+USED_FUELS = [1, 3, 4, 5, 6, 7, 8, 9, 12, 14, 15, 17, 555]
+
+#: Clean fuels (tier 5) and improved fuels (tier 4) for cooking exposure.
+TIER5_FUELS = [6, 15, 16, 17]
+TIER4_FUELS = [8, 10, 11, 12, 13, 14]
+
+#: Answer of I14 for cooking outdoors.
+OUTDOOR = 5
+
+#: Where the household cooks (I14), a column of the main sheet of
+#: ``dataset.xlsx``, and its household identifier.
+PLACE_COLUMN = 'I14_where did you normally cook with the cookstove'
+HOUSEHOLD_COLUMN = 'Household Identification'
+
+#: Section I answers of the primary stove: preparation time in minutes per
+#: meal (I21), fuel availability (I19A) and injuries of the past 12 months
+#: (I31_1 to I31_8, summed).
+CONVENIENCE_COLUMN = 'I21'
+FUEL_AVAILABILITY_COLUMN = 'I19A'
+SAFETY_COLUMNS = ['I31_%d' % number for number in range(1, 9)]
+
+#: Serious injuries (death, burns, respiratory problem, other major injury)
+#: are tier 0 to 3; minor or no injuries tier 4 and 5.
+SAFETY_TIERS = CodeTable({'0-3': [1, 2, 3, 4]}, default='4&5')
+
+#: Fuel always available is tier 5, mostly available tier 4.
+FUEL_AVAILABILITY_TIERS = CodeTable({'5': [1], '4': [2]}, default='0-3')
+
+#: Columns of :func:`cooking_tiers`.
+COOKING_ATTRIBUTES = ['Emission', 'Convenience', 'Safety',
+                      'Fuel_Availability']
+
+
+class StoveLinkage:
+    """Primary stoves and fuel of every household.
+
+    Parameters
+    ----------
+    households : pandas.Series
+        HHID of every household, in the order of the analysis.
+    section_i : pandas.DataFrame
+        Section I, one row per stove.
+    household, stove, fuel : str
+        HHID, stove type (I2) and fuel (I18A) columns of section I.
+    primary : tuple
+        Column flagging the primary stove and its "yes" value.
+    answers : sequence of str
+        Other numeric section I columns to keep for :meth:`primary_answer`.
+    """
+
+    def __init__(self, households, section_i, household='HHID', stove='I2',
+                 fuel='I18A', primary=('I3', 1), answers=()):
+        column, value = primary
+        numeric = [fuel] + list(answers)
+        rows = section_i.loc[section_i[column] == value,
+                             [household, stove] + numeric]
+        self.households = households
+        self.columns = {'household': household, 'stove': stove, 'fuel': fuel}
+        self.primary = rows.assign(
+            **{name: pd.to_numeric(rows[name], errors='coerce')
+               for name in numeric}
+        ).reset_index(drop=True)
+        self._first = self.primary.drop_duplicates(household).set_index(
+            household)
+        #: Fuel of the first primary stove of every household, NaN if none.
+        self.primary_fuel = self.primary_answer(fuel).rename('Fuels')
+
+    def __repr__(self):
+        return 'StoveLinkage(%d households, %d primary stoves)' % (
+            len(self.households), len(self.primary))
+
+    def primary_answer(self, column):
+        """Answer of the first primary stove of every household, NaN if none.
+        """
+        return pd.Series(
+            self.households.map(self._first[column]).to_numpy(
+                dtype=float, na_value=np.nan),
+            index=self.households.index, name=column)
+
+    @property
+    def stoves(self):
+        """Primary stoves of every household, as lists."""
+        grouped = self.primary.groupby(self.columns['household'], sort=False)
+        lists = self.households.map(grouped[self.columns['stove']].agg(list))
+        return [value if isinstance(value, list) else [] for value in lists]
+
+    @property
+    def fuels(self):
+        """Primary fuel of every household as one-item lists, as before."""
+        return [[] if np.isnan(fuel) else [int(fuel)]
+                for fuel in self.primary_fuel]
+
+    def fuel_counts(self, fuels=USED_FUELS, weights=None):
+        """Number of primary stoves per fuel among the linked households.
+
+        A household listed twice in ``households`` counts twice, like in
+        the notebook loop.  With ``weights`` (one per household, aligned
+        on ``households``), every stove counts by the weight of its
+        household instead; see :func:`~mtf.weights.check_weights` for
+        households without one.
+        """
+        if weights is None:
+            repeats = self.households.value_counts()
+        else:
+            weights = np.asarray(weights, dtype=float)
+            repeats = pd.Series(
+                np.where(check_weights(weights), weights, 0),
+                index=self.households.to_numpy())
+            repeats = repeats.groupby(level=0).sum()
+        stoves = self.primary[self.columns['household']].map(repeats)
+        counts = stoves.fillna(0).groupby(
+            self.primary[self.columns['fuel']]).sum()
+        counts.index = counts.index.astype(int)
+        if fuels is not None:
+            counts = counts.reindex(fuels, fill_value=0)
+        if weights is None:
+            counts = counts.astype(int)
+        return counts.rename('count')
+
+
+@instrumented('tiering')
+def emission_tiers(fuel, outdoor):
+    """Tier of cooking exposure from the primary fuel and where it is used.
+
+    Clean fuels used outdoors are tier 5, improved fuels used outdoors tier
+    4 and anything else tier 0 to 3.  Missing fuel or place is missing.
+    """
+    fuel = np.asarray(fuel, dtype=float)
+    place = np.asarray(outdoor, dtype=float)
+    categories = ['0-3', '4', '5', MISSING]
+    codes = np.zeros(len(fuel), dtype=np.int8)
+    codes[np.isin(fuel, TIER4_FUELS) & (place == OUTDOOR)] = 1
+    codes[np.isin(fuel, TIER5_FUELS) & (place == OUTDOOR)] = 2
+    codes[np.isnan(fuel) | np.isnan(place)] = 3
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+@instrumented('tiering')
+def cooking_tiers(main, section_i, household=HOUSEHOLD_COLUMN,
+                  place=PLACE_COLUMN, section_household='HHID'):
+    """Return the cooking tiers of every household.
+
+    Blank answers of the primary stove are missing, where the notebook
+    differs: it gives a blank fuel availability (I19A) tier 0-3 and fails
+    on a blank fuel (I18A).  It also drops the households with a blank
+    number of doors and windows (I16) from the emission tiers; I16 does
+    not enter the tier, so they are tiered here.
+
+    Parameters
+    ----------
+    main : pandas.DataFrame
+        One row per household, with the household identifier and where the
+        household cooks (I14): the main sheet of ``dataset.xlsx``.
+    section_i : pandas.DataFrame
+        Section I, one row per stove.
+    household, place : str
+        Household identifier and I14 columns of ``main``.
+    section_household : str
+        HHID column of ``section_i``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One categorical column per :data:`COOKING_ATTRIBUTES`, indexed like
+        ``main``.  Every attribute is tiered on the first primary stove of
+        the household; households without one are missing.
+    """
+    safety = section_i[SAFETY_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    linkage = StoveLinkage(
+        main[household],
+        section_i.assign(I31=safety.sum(axis=1)),
+        household=section_household,
+        answers=[CONVENIENCE_COLUMN, FUEL_AVAILABILITY_COLUMN, 'I31'])
+    place = pd.to_numeric(main[place], errors='coerce')
+    return pd.DataFrame({
+        'Emission': emission_tiers(linkage.primary_fuel, place),
+        'Convenience': COOKING_CONVENIENCE_TIERS.classify(
+            linkage.primary_answer(CONVENIENCE_COLUMN).to_numpy()),
+        'Safety': SAFETY_TIERS.classify(
+            linkage.primary_answer('I31').to_numpy()),
+        'Fuel_Availability': FUEL_AVAILABILITY_TIERS.classify(
+            linkage.primary_answer(FUEL_AVAILABILITY_COLUMN).to_numpy()),
+    }, index=main.index)
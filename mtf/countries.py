@@ -0,0 +1,229 @@
+"""Country profiles and a batch runner over several countries.
+
+Every MTF survey asks the same questions under different variable names:
+the Ethiopia notebook is the Rwanda one with ``C21`` for ``C22``,
+``C25_wm``/``C25_tm`` for ``C26A``/``C26B`` and so on.  A
+:class:`CountryProfile` maps the variables of one country onto the Rwanda
+names used by :mod:`mtf.electricity`, so the same engine tiers every
+country.
+
+:func:`compare_countries` runs the profiles in a process pool, one worker
+per country dataset, so the wall time is that of the largest country, and
+returns the tier shares of all countries side by side.  A country whose
+answers are not on disk is never skipped silently: the default run warns
+and leaves it out, and a profile asked for explicitly raises.
+"""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .data import MAIN_DATASET, ROOT, Dataset, read_stata
+from .electricity import (ATTRIBUTE_COLUMNS, ATTRIBUTES,
+                          electricity_indicators)
+from .index import access_index
+from .model import DONT_KNOW, DONT_KNOW_CODE
+from .rulebook import load_rulebook
+from .survey import weighted_shares
+
+#: Ethiopia variables of the electricity attributes, by their Rwanda name.
+ETHIOPIA_COLUMNS = {
+    # Capacity: monthly kWh
+    'C22': 'C21',      # National grid
+    'C64': 'C58',      # Mini grid
+    # Hours of supply per day, worst and typical month
+    'C26A': 'C25_wm',
+    'C26B': 'C25_tm',
+    'C68A': 'q62_wm',
+    'C68B': 'C62_tm',
+    'C107A': 'C97_wm',
+    'C107B': 'C97_tm',
+    # Hours of supply per evening
+    'C27A': 'C26_wm',
+    'C27B': 'C26_tm',
+    'C69A': 'C63_wm',
+    'C69B': 'C63_tm',
+    'C108A': 'C98_wm',
+    'C108B': 'C98_tm',
+    # Outages per week and their duration
+    'C29A': 'C28_wm',
+    'C29B': 'C28_tm',
+    'C30A': 'C29_w_h',
+    'C30B': 'C29_t_h',
+    'C71A': 'C65_wm',
+    'C71B': 'q65_tm',
+    'C72A': 'C66_w_h',
+    'C72B': 'q66_t_h',
+    # Quality, formality and health and safety of the national grid
+    'C39': 'C35',
+    'C17': 'C17',
+    'C41': 'C37',
+}
+
+
+_INPUTS = {column for columns in ATTRIBUTE_COLUMNS.values()
+           for column in columns}
+
+
+class CountryProfile:
+    """Where the survey of a country is and how to read it.
+
+    Parameters
+    ----------
+    country : str
+        Name of the country, used as the label of its results.
+    path : str or Path
+        Section C answers, one row per household: a csv export (first
+        column is the row index) or a Stata file.
+    columns : dict, optional
+        Variable of the country for every Rwanda variable it renames.
+        Variables not listed keep their name.
+    rulebook : str
+        Rulebook version of the tier thresholds.
+    household : str
+        Column identifying households.
+    zero_capacity_missing : bool
+        Whether a total of 0 kWh means no answer.
+    dont_know : tuple, optional
+        Answers read as missing in every input column, e.g. the
+        ``"don't know"`` of the Ethiopia survey; by default only the
+        numeric questions drop them.
+    """
+
+    def __init__(self, country, path, columns=None, rulebook='rwanda',
+                 household='HHID', zero_capacity_missing=True,
+                 dont_know=()):
+        self.country = country
+        self.path = Path(path)
+        self.columns = dict(columns or {})
+        self.rulebook = rulebook
+        self.household = household
+        self.zero_capacity_missing = zero_capacity_missing
+        self.dont_know = tuple(dont_know)
+
+    def __repr__(self):
+        return 'CountryProfile(%r, %r)' % (self.country, str(self.path))
+
+    def available(self):
+        """Whether the dataset of the country is on disk."""
+        return self.path.exists()
+
+    def read(self):
+        """Return the answers of the country under the Rwanda names."""
+        if self.path.suffix == '.dta':
+            df = read_stata(self.path)
+        else:
+            df = Dataset(self.path)
+        names = {country: rwanda for rwanda, country in self.columns.items()}
+        keep = [column for column in df.columns
+                if names.get(column, column) in _INPUTS
+                or column == self.household]
+        df = df[keep].rename(columns=names)
+        if self.dont_know:
+            for column in df.columns.drop(self.household, errors='ignore'):
+                df[column] = df[column].where(
+                    ~df[column].isin(self.dont_know), np.nan)
+        return df
+
+    def tiers(self):
+        """Tier table of every household of the country."""
+        indicators = electricity_indicators(
+            self.read(), self.household,
+            zero_capacity_missing=self.zero_capacity_missing)
+        return load_rulebook(self.rulebook).classify(indicators)
+
+
+#: Profiles of the countries whose notebooks are in the repository.  The
+#: Ethiopia folder ships the roster (section A), the cookstoves (section
+#: I) and the notebook, but not the section C answers the notebook reads:
+#: ``Section C.dta`` has to be put next to them for Ethiopia to run.
+PROFILES = {
+    'Rwanda': CountryProfile('Rwanda', MAIN_DATASET),
+    'Ethiopia': CountryProfile('Ethiopia',
+                               ROOT / 'Ethiopia' / 'Section C.dta',
+                               columns=ETHIOPIA_COLUMNS, rulebook='ethiopia',
+                               zero_capacity_missing=False,
+                               dont_know=DONT_KNOW + (DONT_KNOW_CODE,)),
+}
+
+
+def _run(profile):
+    return profile.tiers()
+
+
+def _available(profiles):
+    """Profiles whose answers are on disk.
+
+    The default profiles that are not are left out with a warning; a
+    profile passed explicitly raises.
+    """
+    explicit = profiles is not None
+    if not explicit:
+        profiles = list(PROFILES.values())
+    missing = [profile for profile in profiles if not profile.available()]
+    if missing:
+        message = 'no answers for %s: %s' % (
+            ', '.join(profile.country for profile in missing),
+            ', '.join(str(profile.path) for profile in missing))
+        if explicit:
+            raise FileNotFoundError(message)
+        warnings.warn(message + '; left out')
+    return [profile for profile in profiles if profile.available()]
+
+
+def country_tiers(profiles=None, processes=None):
+    """Tier tables of several countries, computed in parallel.
+
+    Parameters
+    ----------
+    profiles : list of CountryProfile, optional
+        Countries to run; those of :data:`PROFILES` whose data is on disk
+        by default, with a warning naming the others.
+    processes : int, optional
+        Worker processes; one per country by default.
+
+    Returns
+    -------
+    dict
+        Tier table of every country.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the answers of a profile of ``profiles`` are not on disk.
+    """
+    profiles = _available(profiles)
+    if not profiles:
+        return {}
+    with ProcessPoolExecutor(processes or len(profiles)) as pool:
+        tables = pool.map(_run, profiles)
+        return {profile.country: table
+                for profile, table in zip(profiles, tables)}
+
+
+def compare_countries(profiles=None, processes=None):
+    """Tier shares and Access Index of several countries side by side.
+
+    The parameters are those of :func:`country_tiers`, which warns about
+    or raises on the countries whose answers are not on disk.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Share of every (attribute, tier) with one column per country; the
+        rows ``('Access_Index', '')`` hold the index over
+        :data:`~mtf.electricity.ATTRIBUTES`.
+    """
+    tables = country_tiers(profiles, processes)
+    columns = {}
+    for country, tiers in tables.items():
+        shares = weighted_shares(tiers)['share']
+        index = pd.Series([access_index(tiers[ATTRIBUTES])],
+                          index=pd.MultiIndex.from_tuples(
+                              [('Access_Index', '')],
+                              names=shares.index.names))
+        columns[country] = pd.concat([shares, index])
+    return pd.DataFrame(columns)
@@ -0,0 +1,324 @@
+"""Loading the survey sections.
+
+The csv exports (``Main_dataset.csv`` and ``data_converted_csv``) are opened
+through a :class:`Dataset` handle that reads the header only; columns are
+parsed on demand, with explicit dtypes, and kept once loaded.  An attribute
+computation therefore pulls only the handful of columns it uses.
+
+The raw World Bank sections are Stata files.  Reading them is slow, so the
+first read of a section writes a typed Feather (or Parquet) copy next to it,
+in a ``.mtf_cache`` folder, named after the size and modification time of
+the ``.dta`` file.  Later reads memory-map that copy and only materialise the
+requested columns, without reading the ``.dta`` file at all.  The content
+hash of the ``.dta`` file is stored next to the copy: a file that was only
+touched (same content, new modification time) reuses it instead of being
+read again.
+
+The cache needs ``pyarrow``; without it sections are read straight from
+Stata every time.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .profiling import instrumented
+
+#: Root of the repository, where the country folders live.
+ROOT = Path(__file__).resolve().parent.parent
+
+#: One row per household with the section C answers used by the analysis.
+MAIN_DATASET = ROOT / 'Rwanda' / 'Main_dataset.csv'
+
+#: Sections converted from Stata to csv with R, HHID in the first column.
+CONVERTED_SECTIONS = {
+    section: ROOT / 'Rwanda' / 'data_converted_csv' / ('%s.csv' % section)
+    for section in 'ACFGP'
+}
+
+#: Explicit dtypes of the columns that are not plain survey codes.
+#: Everything else is read as a categorical: answers repeat a few values
+#: and may mix numbers with "Don't know".
+DTYPES = {
+    'HHID': 'int64',
+    'sample_weight': 'float64',
+    'C22': 'float64',
+    'C64': 'float64',
+    'C88': 'float64',
+    'C117': 'float64',
+    'C119A': 'float64',
+}
+
+#: Raw Stata sections of every country.
+RAW_SECTIONS = {
+    'Rwanda': {
+        'A': ROOT / 'Rwanda' / 'raw_data' / 'Section A.dta',
+        'C': ROOT / 'Rwanda' / 'raw_data' / 'Section C.dta',
+        'G': ROOT / 'Rwanda' / 'raw_data' / 'Section G.dta',
+    },
+    'Ethiopia': {
+        'A': ROOT / 'Ethiopia' / 'Section A_HHRoster.dta',
+        'I': ROOT / 'Ethiopia' / 'Section I.dta',
+    },
+}
+
+#: ``read_stata`` options needed by some sections.  The Ethiopia roster
+#: has duplicated value labels and is read with its numeric codes.
+READ_OPTIONS = {
+    ('Ethiopia', 'A'): {'convert_categoricals': False},
+}
+
+CACHE_DIR = '.mtf_cache'
+_CHUNK = 1 << 20
+
+
+class Dataset:
+    """Lazy, column-projected handle on a csv export.
+
+    Parameters
+    ----------
+    path : str or Path
+        The csv file; its first column is the row index.
+    dtypes : dict, optional
+        dtype of each column, :data:`DTYPES` by default.
+    default_dtype : str
+        dtype of the columns missing from ``dtypes``.
+    """
+
+    def __init__(self, path, dtypes=None, default_dtype='category'):
+        self.path = Path(path)
+        self.dtypes = DTYPES if dtypes is None else dtypes
+        self.default_dtype = default_dtype
+        self._header = None
+        self._loaded = None
+
+    def __repr__(self):
+        return 'Dataset(%r)' % str(self.path)
+
+    @property
+    def columns(self):
+        """Column names, from the header line only."""
+        if self._header is None:
+            self._header = pd.read_csv(self.path, nrows=0).columns[1:].tolist()
+        return self._header
+
+    @property
+    def index(self):
+        return self.load([]).index
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, columns):
+        if isinstance(columns, str):
+            return self.load([columns])[columns]
+        return self.load(columns)
+
+    @instrumented('ingestion')
+    def load(self, columns):
+        """Return ``columns`` as a DataFrame, parsing the ones not read yet.
+
+        Unknown columns raise a KeyError.
+        """
+        columns = list(columns)
+        unknown = [column for column in columns if column not in self.columns]
+        if unknown:
+            raise KeyError('%s not in %s' % (unknown, self.path.name))
+        pending = [column for column in columns
+                   if self._loaded is None or column not in self._loaded]
+        if pending or self._loaded is None:
+            positions = [0] + [self.columns.index(column) + 1
+                               for column in pending]
+            dtypes = {column: self.dtypes.get(column, self.default_dtype)
+                      for column in pending}
+            # One chunk: categories inferred per chunk may not agree on
+            # their dtype, e.g. numbers first and "Don't know" later.
+            block = pd.read_csv(self.path, usecols=positions, index_col=0,
+                                dtype=dtypes, low_memory=False)
+            self._loaded = (block if self._loaded is None
+                            else pd.concat([self._loaded, block], axis=1))
+        return self._loaded[columns]
+
+    def reindex(self, columns):
+        """Like :meth:`load`, unknown columns coming back empty."""
+        known = [column for column in columns if column in self.columns]
+        return self.load(known).reindex(columns=columns)
+
+
+def main_dataset(path=MAIN_DATASET, **kwargs):
+    """Return a :class:`Dataset` handle on ``Main_dataset.csv``."""
+    return Dataset(path, **kwargs)
+
+
+def main_households(section='P', household='HHID'):
+    """HHID of every row of ``Main_dataset.csv``.
+
+    The main dataset has no HHID column; its rows follow the households of
+    the converted sections in increasing HHID order.
+    """
+    ids = converted_section(section)[[household]][household]
+    return pd.Index(np.unique(ids.to_numpy(dtype=np.int64)), name=household)
+
+
+def converted_section(section, **kwargs):
+    """Return a :class:`Dataset` handle on ``data_converted_csv/<section>``."""
+    try:
+        path = CONVERTED_SECTIONS[section]
+    except KeyError:
+        raise KeyError('no converted section %r' % section) from None
+    return Dataset(path, **kwargs)
+
+
+def file_hash(path):
+    """Return the SHA-256 hex digest of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(path, fmt='feather', **options):
+    """Return where the cache of the file ``path`` is stored.
+
+    The key is the size and modification time of the file, so that finding
+    the cache does not read it.  ``options`` are the arguments of the
+    reader (``read_stata``, ``load_weights``); they are part of the key
+    because they change what is cached.
+    """
+    path = Path(path)
+    stat = path.stat()
+    digest = hashlib.sha256(json.dumps(
+        [stat.st_size, stat.st_mtime_ns, options], sort_keys=True).encode())
+    return path.parent / CACHE_DIR / ('%s.%s.%s' % (path.stem,
+                                                    digest.hexdigest()[:16],
+                                                    fmt))
+
+
+def _sidecar(cache):
+    """Where the content hash of the source of ``cache`` is stored."""
+    return cache.with_name(cache.name + '.json')
+
+
+def _reuse_cache(path, target, fmt, options):
+    """Adopt a cache of the same content under the key ``target``.
+
+    Returns whether a cache was found.  Only used when the key misses, e.g.
+    after a checkout gave the ``.dta`` file a new modification time.
+    """
+    if not target.parent.is_dir():
+        return False
+    content = file_hash(path)
+    for sidecar in target.parent.glob('%s.*.%s.json' % (path.stem, fmt)):
+        cache = sidecar.with_name(sidecar.name[:-len('.json')])
+        stored = json.loads(sidecar.read_text())
+        if (stored.get('sha256') == content
+                and stored.get('options') == options and cache.exists()):
+            cache.replace(target)
+            sidecar.replace(_sidecar(target))
+            return True
+    return False
+
+
+def _read_cache(cache, fmt, columns):
+    if fmt == 'feather':
+        from pyarrow import feather
+        table = feather.read_table(cache, columns=columns, memory_map=True)
+    else:
+        from pyarrow import parquet
+        table = parquet.read_table(cache, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def _typed(df):
+    """Make the value labels of ``df`` storable by Arrow.
+
+    Some Stata value labels mix numbers and strings ("Don't know" next to
+    the numeric answers); such categories are stored as strings.
+    """
+    for column in df.columns:
+        values = df[column]
+        if (isinstance(values.dtype, pd.CategoricalDtype)
+                and values.cat.categories.dtype == object
+                and not all(isinstance(label, str)
+                            for label in values.cat.categories)):
+            df[column] = values.cat.rename_categories(
+                [str(label) for label in values.cat.categories])
+    return df
+
+
+def _write_cache(df, cache, fmt, source=None, options=None):
+    cache.parent.mkdir(exist_ok=True)
+    partial = cache.with_name(cache.name + '.partial')
+    try:
+        if fmt == 'feather':
+            # Uncompressed so that later reads can be memory-mapped.
+            df.to_feather(partial, compression='uncompressed')
+        else:
+            df.to_parquet(partial, index=False)
+    except Exception:
+        partial.unlink()
+        raise
+    partial.replace(cache)
+    if source is not None:
+        _sidecar(cache).write_text(json.dumps(
+            {'sha256': file_hash(source), 'options': options or {}}))
+
+
+@instrumented('ingestion')
+def read_stata(path, columns=None, fmt='feather', cache=True, **options):
+    """Read a Stata section, going through its columnar cache.
+
+    Parameters
+    ----------
+    path : str or Path
+        The ``.dta`` file.
+    columns : list of str, optional
+        Columns to load; all of them by default.
+    fmt : {'feather', 'parquet'}
+        Format of the cache.
+    cache : bool
+        Set to False to bypass the cache.
+    **options
+        Passed to :func:`pandas.read_stata`, e.g.
+        ``convert_categoricals=False``.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    if fmt not in ('feather', 'parquet'):
+        raise ValueError("fmt must be 'feather' or 'parquet', not %r" % fmt)
+    if cache:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            cache = False
+    if not cache:
+        # Same frame as the cached path: typed labels and a fresh index.
+        return _typed(pd.read_stata(path, columns=columns, **options)
+                      .reset_index(drop=True))
+
+    target = cache_path(path, fmt, **options)
+    if not target.exists() and not _reuse_cache(path, target, fmt, options):
+        df = _typed(pd.read_stata(path, **options).reset_index(drop=True))
+        _write_cache(df, target, fmt, path, options)
+        return df[columns] if columns is not None else df
+    return _read_cache(target, fmt, columns)
+
+
+def read_section(country, section, columns=None, **options):
+    """Read ``section`` of ``country`` from :data:`RAW_SECTIONS`."""
+    try:
+        path = RAW_SECTIONS[country][section]
+    except KeyError:
+        raise KeyError('no raw section %r for %r'
+                       % (section, country)) from None
+    options = dict(READ_OPTIONS.get((country, section), {}), **options)
+    return read_stata(path, columns=columns, **options)
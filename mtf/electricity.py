@@ -0,0 +1,539 @@
+"""MTF electricity tiers of every household in a single pass.
+
+The notebooks slice ``df`` once per attribute, rename and clean every slice
+and finally stack the per-attribute frames with ``pd.concat``.  Here the
+C-columns needed by all the attributes are read once and the result is one
+household-indexed table with a categorical column per attribute, plus the
+aggregate ``MTF`` tier (the lowest tier over the assessed attributes).
+
+The work is split in two steps: :func:`electricity_indicators` reduces the
+answers to one indicator per attribute (Wh/day, hours of supply, ...) and
+:func:`classify_indicators` applies the tier tables.  The indicators can
+therefore be classified with several sets of tables (see
+:mod:`mtf.rulebook`) without reading the answers again.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .capacity import CAPACITY_COLUMNS, total_capacity
+from .model import DONT_KNOW, DONT_KNOW_CODE, numeric_answers
+from .profiling import instrumented
+from .solar import SOLAR_CAPACITY, SOLAR_DAY, SOLAR_EVENING
+from .sources import (MONTHS, coalesce_months, combine_sources,
+                      pair_columns, primary_source, source_matrix,
+                      source_positions)
+from .tiers import (CAPACITY_TIERS, DAY_AVAILABILITY_TIERS,
+                    EVENING_AVAILABILITY_TIERS, MISSING, TIERS, CodeTable,
+                    OutageTable, tier_floor)
+
+#: Hours of supply per day in the (worst, typical) month for every source.
+#: Sources asked only once (the rechargeable battery) have no typical month.
+DAY_AVAILABILITY_COLUMNS = [
+    ('C26A', 'C26B'),    # National grid
+    ('C68A', 'C68B'),    # Mini grid
+    ('C107A', 'C107B'),  # Generator set
+    ('C137A', 'C137B'),  # Pico-hydro
+    ('C172A', 'C172B'),  # Solar device
+    ('C127', None),      # Rechargeable battery
+]
+
+#: Hours of supply per evening in the (worst, typical) month.
+EVENING_AVAILABILITY_COLUMNS = [
+    ('C27A', 'C27B'),    # National grid
+    ('C69A', 'C69B'),    # Mini grid
+    ('C108A', 'C108B'),  # Generator set
+    ('C138A', 'C138B'),  # Pico-hydro
+    ('C173A', 'C173B'),  # Solar device
+]
+
+#: Source of every column of the availability questions.
+DAY_AVAILABILITY_SOURCES = ['National_Grid', 'Mini_Grid', 'Generator',
+                            'Pico_Hydro', 'Solar_Device', 'Battery']
+EVENING_AVAILABILITY_SOURCES = DAY_AVAILABILITY_SOURCES[:5]
+
+#: Solar device answers of ``Main_dataset.csv``, day and evening; the
+#: solar device module of ``C.csv`` (see :mod:`mtf.solar`) fills them in.
+SOLAR_DEVICE_COLUMNS = {SOLAR_DAY: ('C172A', 'C172B'),
+                        SOLAR_EVENING: ('C173A', 'C173B')}
+
+#: Outages per week and their duration (hours) in the (worst, typical)
+#: month, for the grid sources, in order of precedence.
+RELIABILITY_COLUMNS = {
+    'National_Grid': {'frequency': ('C29A', 'C29B'),
+                      'duration': ('C30A', 'C30B')},
+    'Mini_Grid': {'frequency': ('C71A', 'C71B'),
+                  'duration': ('C72A', 'C72B')},
+}
+
+#: Outages of one grid source: at most 3 a week lasting less than 2 hours
+#: in total is tier 5, at most 14 lasting more than 2 hours tier 3 or 4,
+#: anything else tier 0 to 2.
+RELIABILITY_TIERS = OutageTable([('5', (0, 3), (None, 2)),
+                                 ('3&4', (3, 14), (2, None))],
+                                default='0,1&2')
+
+#: Reliability tiers, from the codes of :func:`reliability_codes`.
+RELIABILITY_CATEGORIES = RELIABILITY_TIERS.categories
+
+#: Reliability policy of :func:`household_reliability` under every source
+#: policy of :data:`~mtf.sources.POLICIES`.
+RELIABILITY_POLICIES = {'sum': 'first', 'primary': 'primary', 'max': 'max'}
+
+#: National grid appliance damage, bill payment and accidents.
+QUALITY_COLUMN = 'C39'
+FORMALITY_COLUMN = 'C17'
+HEALTH_SAFETY_COLUMN = 'C41'
+
+#: Appliances damaged by voltage problems.  Older exports code "Yes" as 1.
+QUALITY_TIERS = CodeTable({'0,1,2&3': ['Yes', 1]}, default='4&5',
+                          missing_values=DONT_KNOW + (DONT_KNOW_CODE,))
+
+#: No bill paid for electricity (code 111).
+FORMALITY_TIERS = CodeTable({'0,1,2&3': ['No bill for electricity', 111]},
+                            default='4&5')
+
+#: Serious or fatal accidents caused by the connection.
+HEALTH_SAFETY_TIERS = CodeTable({'0,1,2&3': ['Yes', 1]}, default='4&5')
+
+#: Aggregate tier, the minimum over the attributes.
+MTF_TIERS = TIERS
+
+#: Tier table of every attribute.  Reliability combines two answers per
+#: grid source: its :class:`~mtf.tiers.OutageTable` is applied by
+#: :func:`reliability_by_source`, before the sources are combined.
+TIER_TABLES = {
+    'Capacity': CAPACITY_TIERS,
+    'Availability': DAY_AVAILABILITY_TIERS,
+    'Evening_Availability': EVENING_AVAILABILITY_TIERS,
+    'Reliability': RELIABILITY_TIERS,
+    'Quality': QUALITY_TIERS,
+    'Formality': FORMALITY_TIERS,
+    'Health_Safety': HEALTH_SAFETY_TIERS,
+}
+
+#: Column order of the tier table.
+ATTRIBUTES = ['Capacity', 'Availability', 'Evening_Availability',
+              'Reliability', 'Quality', 'Formality', 'Health_Safety']
+
+
+#: Section C columns read by each attribute.
+ATTRIBUTE_COLUMNS = {
+    'Capacity': list(CAPACITY_COLUMNS),
+    'Availability': pair_columns(DAY_AVAILABILITY_COLUMNS),
+    'Evening_Availability': pair_columns(EVENING_AVAILABILITY_COLUMNS),
+    'Reliability': pair_columns(pair
+                                for source in RELIABILITY_COLUMNS.values()
+                                for pair in source.values()),
+    'Quality': [QUALITY_COLUMN],
+    'Formality': [FORMALITY_COLUMN],
+    'Health_Safety': [HEALTH_SAFETY_COLUMN],
+}
+
+
+def _with_solar(pairs, column):
+    """``pairs`` with the solar device answers falling back on ``column``."""
+    device = SOLAR_DEVICE_COLUMNS[column]
+    return [pair + (column,) if pair == device else pair for pair in pairs]
+
+
+def _read(df, columns):
+    """Return ``df[columns]``, absent columns being left unanswered.
+
+    ``df`` may be a DataFrame or a lazy :class:`~mtf.data.Dataset`, which
+    then only parses these columns.
+    """
+    absent = [column for column in columns if column not in df.columns]
+    if absent:
+        warnings.warn('columns not in the dataset, treated as missing: %s'
+                      % ', '.join(absent))
+    return df.reindex(columns=columns)
+
+
+def reliability_codes(frequency, duration):
+    """Reliability tier codes (positions in :data:`RELIABILITY_CATEGORIES`)
+    of :data:`RELIABILITY_TIERS`.  Missing frequency or duration is missing.
+    """
+    return RELIABILITY_TIERS.codes(frequency, duration)
+
+
+def reliability_tiers(frequency, duration):
+    """Reliability tier of one source, see :func:`reliability_codes`."""
+    return RELIABILITY_TIERS.classify(frequency, duration)
+
+
+def _outage_pairs(columns=RELIABILITY_COLUMNS):
+    """Frequency and duration pairs of every source, side by side."""
+    return [pair for source in columns.values()
+            for pair in (source['frequency'], source['duration'])]
+
+
+def _reliability_frame(months, columns, index, table=RELIABILITY_TIERS):
+    """Per source tiers from coalesced frequency and duration columns."""
+    codes = table.codes(months[:, 0::2], months[:, 1::2])
+    return pd.DataFrame({
+        source: pd.Categorical.from_codes(codes[:, j],
+                                          categories=table.categories)
+        for j, source in enumerate(columns)
+    }, index=index)
+
+
+def reliability_by_source(outages, columns=RELIABILITY_COLUMNS,
+                          month='worst', table=RELIABILITY_TIERS):
+    """Reliability tier of every grid source.
+
+    Parameters
+    ----------
+    outages : pandas.DataFrame
+        Numeric outage answers, 888 already missing.
+    columns : dict
+        Frequency and duration columns of every source.
+    month : {'worst', 'typical'}
+        Month used first, see :func:`~mtf.sources.coalesce_months`.
+    table : mtf.tiers.OutageTable
+        Rules of the tiers.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One categorical column per source.
+    """
+    # Frequencies and durations of all sources side by side: one pass of
+    # the rules over a (households, sources) array.
+    months = coalesce_months(outages, _outage_pairs(columns), month)
+    return _reliability_frame(months, columns, outages.index, table)
+
+
+def household_reliability(by_source, policy='first', primary=None):
+    """Reliability of the household from the tiers of its grid sources.
+
+    Parameters
+    ----------
+    by_source : pandas.DataFrame
+        Output of :func:`reliability_by_source`.
+    policy : {'first', 'primary', 'max'}
+        Tier kept when several sources are assessed: with ``'first'`` the
+        first assessed source, in the order of the columns (the national
+        grid when assessed, else the mini grid, as in the notebook); with
+        ``'primary'`` the primary source of the household, missing when
+        that is not a grid; with ``'max'`` the best tier.  Tiers do not
+        add up: the ``'sum'`` policy of the other attributes uses
+        ``'first'`` (see :data:`RELIABILITY_POLICIES`).
+    primary : numpy.ndarray, optional
+        Column of the primary source in ``by_source``, -1 for none (see
+        :func:`~mtf.sources.source_positions`).
+
+    Raises
+    ------
+    ValueError
+        If ``policy`` is not ``'first'``, ``'primary'`` or ``'max'``.
+    """
+    if policy not in RELIABILITY_POLICIES.values():
+        raise ValueError('policy must be one of %s, not %r'
+                         % (', '.join(RELIABILITY_POLICIES.values()), policy))
+    codes = np.column_stack([by_source[source].cat.codes.to_numpy()
+                             for source in by_source.columns])
+    categories = list(by_source[by_source.columns[0]].cat.categories)
+    missing = len(categories) - 1
+    assessed = codes != missing
+    if policy == 'first':
+        first = np.argmax(assessed, axis=1)
+        chosen = codes[np.arange(len(codes)), first]
+    else:
+        # Codes rank the tiers from the lowest up, so the sources combine
+        # like the other attributes.
+        chosen = combine_sources(np.where(assessed, codes, np.nan), policy,
+                                 primary)
+        chosen = np.where(np.isnan(chosen), missing, chosen)
+    return pd.Categorical.from_codes(chosen.astype(np.int8),
+                                     categories=categories)
+
+
+def mtf_tier(tiers):
+    """Aggregate tier: the lowest tier over the assessed attributes.
+
+    Attributes that are missing are left out; the aggregate is missing only
+    when no attribute could be assessed.
+    """
+    floors = np.column_stack([tier_floor(tiers[column])
+                              for column in tiers.columns]).astype(float)
+    floors[floors < 0] = np.nan
+    assessed = ~np.isnan(floors).all(axis=1)
+    lowest = np.full(len(floors), np.nan)
+    lowest[assessed] = np.nanmin(floors[assessed], axis=1)
+    return MTF_TIERS.classify(pd.Series(lowest, index=tiers.index, name='MTF'))
+
+
+@instrumented('tiering')
+def electricity_indicators(df, household='HHID', zero_capacity_missing=True,
+                           solar=None, households=None, policy='sum',
+                           month='worst', reliability=RELIABILITY_TIERS):
+    """Return the indicator of every attribute for every household of ``df``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame or mtf.data.Dataset
+        Section C answers, one row per household (``Main_dataset.csv``).
+    household : str
+        Column identifying households; the index of ``df`` is used when
+        the column is absent.
+    zero_capacity_missing : bool
+        Treat a total of 0 kWh as missing, as the Rwanda analysis does.
+    solar : pandas.DataFrame, optional
+        Solar devices by HHID, see :func:`~mtf.solar.solar_sources`.  The
+        panels add to the capacity sources and the hours of service fill in
+        the blank solar device answers.
+    households : array-like, optional
+        HHID of every row of ``df``, for data without a ``household``
+        column such as ``Main_dataset.csv``
+        (:func:`~mtf.data.main_households`).  Also used as the index.
+    policy : str
+        How the sources of capacity and availability combine, see
+        :func:`~mtf.sources.combine_sources`: ``'sum'`` (the notebooks),
+        ``'primary'`` or ``'max'``.  The primary source of a household is
+        the one with the most hours a day, else in the evening, else the
+        largest capacity; reliability is then that of its primary source.
+        Reliability tiers do not add up: under ``'sum'`` the household
+        gets the tier of its first assessed grid (see
+        :data:`RELIABILITY_POLICIES` and :func:`household_reliability`).
+    month : {'worst', 'typical'}
+        Month used first for the questions asked for the worst and the
+        typical month, see :func:`~mtf.sources.coalesce_months`.
+    reliability : mtf.tiers.OutageTable
+        Rules tiering the outages of every grid source.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Daily capacity (Wh), hours of supply per day and per evening, the
+        reliability tier and the raw quality, formality and health and
+        safety answers, one column per attribute in :data:`ATTRIBUTES`.
+
+    Raises
+    ------
+    ValueError
+        If ``solar`` is given and none of its HHIDs is a household of
+        ``df``, typically rows numbered rather than identified by HHID.
+    """
+    return _indicators(df, household, zero_capacity_missing, solar,
+                       households, policy, month, reliability)[0]
+
+
+@instrumented('tiering')
+def seasonal_indicators(df, household='HHID', zero_capacity_missing=True,
+                        solar=None, households=None, policy='sum',
+                        reliability=RELIABILITY_TIERS):
+    """Indicators of the worst-first and typical-first month scenarios.
+
+    Both scenarios come from the same read of the answers and the same
+    coalescing pass (see :func:`~mtf.sources.coalesce_months`); the
+    parameters are those of :func:`electricity_indicators`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns keyed by (month, attribute), months in the order of
+        :data:`~mtf.sources.MONTHS`.
+    """
+    frames = _indicators(df, household, zero_capacity_missing, solar,
+                         households, policy, 'both', reliability)
+    return pd.concat(dict(zip(MONTHS, frames)), axis=1)
+
+
+_NO_SOLAR = ('none of the %d households has a solar device row; are they '
+             'identified by HHID? Main_dataset.csv rows are numbered, pass '
+             'households=mtf.data.main_households()')
+
+
+def _indicators(df, household, zero_capacity_missing, solar, households,
+                policy, month, reliability):
+    """Indicator frames of :func:`electricity_indicators`, one per month
+    scenario (two when ``month`` is ``'both'``)."""
+    day = DAY_AVAILABILITY_COLUMNS
+    evening = EVENING_AVAILABILITY_COLUMNS
+    outage_columns = ATTRIBUTE_COLUMNS['Reliability']
+    columns = [column for attribute in ATTRIBUTES
+               for column in ATTRIBUTE_COLUMNS[attribute]]
+    if household in df.columns:
+        columns.append(household)
+    data = _read(df, columns)
+    if households is None:
+        households = (data[household] if household in data.columns
+                      else data.index)
+    households = pd.Index(households)
+    capacity = list(CAPACITY_COLUMNS)
+    capacity_sources = list(CAPACITY_COLUMNS.values())
+
+    if solar is not None:
+        # Keyed join on HHID: the devices join the sources of the main
+        # dataset as extra columns of the same source matrices.
+        if (len(households) and len(solar)
+                and not solar.index.isin(households).any()):
+            raise ValueError(_NO_SOLAR % len(households))
+        joined = solar.reindex(households)
+        data = data.assign(**{column: joined[column].to_numpy()
+                              for column in solar.columns})
+        capacity.append(SOLAR_CAPACITY)
+        capacity_sources.append('Solar_Device')
+        day = _with_solar(day, SOLAR_DAY)
+        evening = _with_solar(evening, SOLAR_EVENING)
+
+    # "Don't know" counts as 0 hours of supply, as in the notebooks.
+    hours = numeric_answers(data, pair_columns(day) + pair_columns(evening),
+                            dont_know=0, dtype='float64')
+    outages = numeric_answers(data, outage_columns, dtype='float64')
+    # Worst and typical month answers of all the sources coalesced at
+    # once, with a leading axis for the month scenarios.
+    scenarios = (coalesce_months(hours, day, month),
+                 coalesce_months(hours, evening, month),
+                 coalesce_months(outages, _outage_pairs(), month))
+    if month != 'both':
+        scenarios = tuple(matrix[np.newaxis] for matrix in scenarios)
+
+    frames = []
+    for day_hours, evening_hours, outage_months in zip(*scenarios):
+        # Source resolution: the primary source is chosen once, before
+        # the attributes, and each attribute reads the column of that
+        # source.
+        positions = dict.fromkeys(['Capacity', 'Availability',
+                                   'Evening_Availability', 'Reliability'])
+        if policy == 'primary':
+            primary = primary_source([
+                (day_hours, DAY_AVAILABILITY_SOURCES),
+                (evening_hours, EVENING_AVAILABILITY_SOURCES),
+                (source_matrix(data, capacity), capacity_sources)])
+            for attribute, names in (
+                    ('Capacity', capacity_sources),
+                    ('Availability', DAY_AVAILABILITY_SOURCES),
+                    ('Evening_Availability', EVENING_AVAILABILITY_SOURCES),
+                    ('Reliability', list(RELIABILITY_COLUMNS))):
+                positions[attribute] = source_positions(primary, names)
+
+        frames.append(pd.DataFrame({
+            'Capacity': total_capacity(
+                data, capacity, zero_as_missing=zero_capacity_missing,
+                policy=policy, primary=positions['Capacity']).to_numpy(),
+            'Availability': combine_sources(
+                day_hours, policy, positions['Availability']),
+            'Evening_Availability': combine_sources(
+                evening_hours, policy, positions['Evening_Availability']),
+            'Reliability': household_reliability(_reliability_frame(
+                outage_months, RELIABILITY_COLUMNS, outages.index,
+                reliability), RELIABILITY_POLICIES.get(policy, policy),
+                positions['Reliability']),
+            'Quality': data[QUALITY_COLUMN].array,
+            'Formality': data[FORMALITY_COLUMN].array,
+            'Health_Safety': data[HEALTH_SAFETY_COLUMN].array,
+        }, index=households))
+    return frames
+
+
+def missing_as(tiers, label):
+    """Report the missing households of ``tiers`` as tier ``label``.
+
+    Some analyses count unanswered questions as tier 0.
+    """
+    tiers = pd.Categorical(tiers)
+    categories = [category for category in tiers.categories
+                  if category != MISSING]
+    if label not in categories:
+        categories.append(label)
+    lookup = np.array([categories.index(label if category == MISSING
+                                        else category)
+                       for category in tiers.categories] + [-1],
+                      dtype=np.int8)
+    return pd.Categorical.from_codes(lookup[tiers.codes],
+                                     categories=categories)
+
+
+@instrumented('tiering')
+def classify_indicators(indicators, tables=None, missing_tier=None):
+    """Tier table of the indicators of :func:`electricity_indicators`.
+
+    Parameters
+    ----------
+    indicators : pandas.DataFrame
+        One indicator column per attribute.
+    tables : dict, optional
+        Tier table of every attribute, :data:`TIER_TABLES` by default.  An
+        attribute without a table, or with an
+        :class:`~mtf.tiers.OutageTable`, must already be tiered.
+    missing_tier : str, optional
+        Tier given to missing answers instead of :data:`~mtf.tiers.MISSING`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One categorical column per attribute and the aggregate ``MTF``
+        tier.
+    """
+    tables = TIER_TABLES if tables is None else tables
+    tiers = pd.DataFrame(index=indicators.index)
+    for attribute in ATTRIBUTES:
+        table = tables.get(attribute)
+        values = indicators[attribute]
+        tiers[attribute] = (
+            pd.Categorical(values.array)
+            if table is None or isinstance(table, OutageTable)
+            else table.classify(values.array))
+        if missing_tier is not None:
+            tiers[attribute] = missing_as(tiers[attribute], missing_tier)
+    tiers['MTF'] = mtf_tier(tiers).array
+    return tiers
+
+
+def _reliability_table(tables):
+    """Outage rules of ``tables``, :data:`RELIABILITY_TIERS` by default."""
+    table = None if tables is None else tables.get('Reliability')
+    return table if isinstance(table, OutageTable) else RELIABILITY_TIERS
+
+
+def electricity_tiers(df, household='HHID', tables=None, solar=None,
+                      households=None, policy='sum', month='worst'):
+    """Return the tier of every attribute for every household of ``df``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame or mtf.data.Dataset
+        Section C answers, one row per household (``Main_dataset.csv``).
+    household : str
+        Column identifying households; the index of ``df`` is used when
+        the column is absent.
+    tables : dict, optional
+        Tier tables to use instead of :data:`TIER_TABLES`; an
+        :class:`~mtf.tiers.OutageTable` for ``'Reliability'`` replaces the
+        outage rules.
+    solar, households, policy, month : optional
+        Solar devices, HHID of every row, source policy and month used
+        first, see :func:`electricity_indicators`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One categorical column per attribute in :data:`ATTRIBUTES` and the
+        aggregate ``MTF`` tier, indexed by household.
+    """
+    indicators = electricity_indicators(
+        df, household, solar=solar, households=households, policy=policy,
+        month=month, reliability=_reliability_table(tables))
+    return classify_indicators(indicators, tables)
+
+
+def seasonal_tiers(df, household='HHID', tables=None, solar=None,
+                   households=None, policy='sum'):
+    """Tier tables of the worst-first and typical-first month scenarios.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns keyed by (month, attribute), see
+        :func:`seasonal_indicators`; the difference between the two is the
+        seasonal sensitivity of the tiers.
+    """
+    indicators = seasonal_indicators(
+        df, household, solar=solar, households=households, policy=policy,
+        reliability=_reliability_table(tables))
+    return pd.concat({month: classify_indicators(indicators[month], tables)
+                      for month in MONTHS}, axis=1)
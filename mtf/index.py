@@ -0,0 +1,169 @@
+"""Index of access: the tier distribution summarised as one number.
+
+The MTF index weighs every tier by its rank,
+
+    AI = sum over k of 20 * k * P_k,
+
+where ``P_k`` is the share of tier ``k`` among the assessed attributes of
+all households; 0 means no access and 100 full access.  Composite labels
+such as ``'3&4'`` count as their lowest tier, as in the notebooks; counting
+them as their highest tier instead gives the optimistic bound of the index
+(:func:`access_index_bounds`).
+
+The index depends on the weights, on the attributes averaged and on their
+labels.  On ``Main_dataset.csv`` the seven
+:data:`~mtf.electricity.ATTRIBUTES` give 64.82 unweighted, and 63.07 with
+the ``P.csv`` weights of the report.  The notebook counts every household
+once and its ``df_TIER`` leaves out evening availability, which gives
+65.08 over the other six.  Its quality and formality cells also compare
+the text answers with ``1`` and ``111``, which never match, so every
+answered household is tier 4&5; with those labels the six attributes give
+68.90.
+
+Confidence intervals come from a bootstrap over households.  Households
+with the same tier profile are interchangeable, so a replicate only needs
+how many households of each profile it draws: one multinomial draw per
+replicate instead of resampling every household.  Weighted tables group
+the households by profile and weight, and every replicate is the weighted
+index of its draw.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .profiling import instrumented
+from .tiers import tier_ceiling, tier_floor
+from .weights import check_weights, split_weights
+
+#: Tier numbers 0 to 5.
+TIER_NUMBERS = np.arange(6)
+
+AccessIndex = namedtuple('AccessIndex', 'index low high replicates')
+
+_BOUNDS = {'lower': tier_floor, 'upper': tier_ceiling}
+
+
+def household_counts(tiers, bound='lower', weights=None):
+    """Return how many attributes of every household are in each tier.
+
+    Parameters
+    ----------
+    tiers : pandas.DataFrame or pandas.Series
+        Tier labels, one row per household and one column per attribute.
+        A ``weight`` column holds the weight of every household.
+    bound : {'lower', 'upper'}
+        Tier counted for composite labels such as ``'3&4'``.
+    weights : array-like, optional
+        Weight of every household, instead of the ``weight`` column.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(households, 6)`` array; missing tiers are not counted.  Int
+        counts, or float counts multiplied by the household weights.
+    """
+    if bound not in _BOUNDS:
+        raise ValueError("bound must be 'lower' or 'upper', not %r" % bound)
+    if isinstance(tiers, pd.Series):
+        tiers = tiers.to_frame()
+    tiers, weights = split_weights(tiers, weights)
+    size = len(tiers) * len(TIER_NUMBERS)
+    cells = np.arange(0, size, len(TIER_NUMBERS))
+    counts = np.zeros(size, dtype=np.int64 if weights is None else float)
+    if weights is not None:
+        weights = np.where(check_weights(weights), weights, 0)
+    for column in tiers.columns:
+        floors = _BOUNDS[bound](tiers[column])
+        assessed = floors >= 0
+        counts += np.bincount(
+            cells[assessed] + floors[assessed], minlength=size,
+            weights=None if weights is None else weights[assessed])
+    return counts.reshape(len(tiers), len(TIER_NUMBERS))
+
+
+def index_from_counts(counts):
+    """Access index of tier counts (the last axis runs over tiers 0 to 5)."""
+    counts = np.asarray(counts, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 20 * (counts @ TIER_NUMBERS) / counts.sum(axis=-1)
+
+
+def access_index(tiers, bound='lower', weights=None):
+    """Access index of a tier table (or of a single tier column).
+
+    Households count by their weight when ``tiers`` has a ``weight``
+    column or ``weights`` are given.
+    """
+    counts = household_counts(tiers, bound, weights)
+    return float(index_from_counts(counts.sum(axis=0)))
+
+
+def access_index_bounds(tiers, weights=None):
+    """Pessimistic and optimistic access index of a tier table.
+
+    Composite labels count as their lowest tier for the first and as their
+    highest for the second; plain tiers count the same in both.
+    """
+    return (access_index(tiers, 'lower', weights),
+            access_index(tiers, 'upper', weights))
+
+
+@instrumented('aggregation')
+def bootstrap_access_index(tiers, replicates=10000, level=0.95, seed=None,
+                           batch=2000, weights=None):
+    """Access index with a percentile bootstrap confidence interval.
+
+    Parameters
+    ----------
+    tiers : pandas.DataFrame or pandas.Series
+        Tier table, one row per household.
+    replicates : int
+        Number of bootstrap samples of the households.
+    level : float
+        Coverage of the interval.
+    seed : int or numpy.random.Generator, optional
+        Seed of the resampling.
+    batch : int
+        Replicates drawn at once, to bound memory.
+    weights : array-like, optional
+        Weight of every household, instead of the ``weight`` column.
+
+    Returns
+    -------
+    AccessIndex
+        Point estimate, interval bounds and the replicate values.  With
+        weights, households are drawn uniformly and every replicate is the
+        weighted index of its draw; households without a weight are left
+        out, see :func:`~mtf.weights.check_weights`.
+    """
+    tiers, weights = split_weights(
+        tiers.to_frame() if isinstance(tiers, pd.Series) else tiers, weights)
+    counts = household_counts(tiers)
+    # Number every profile by reading its counts as digits of one integer.
+    base = counts.max() + 1 if counts.size else 1
+    keys = counts @ base ** TIER_NUMBERS
+    if weights is None:
+        keys, first, households = np.unique(keys, return_index=True,
+                                            return_counts=True)
+        profiles = counts[first]
+    else:
+        # Households of the same profile and weight are interchangeable.
+        kept = check_weights(weights)
+        counts, keys, weights = counts[kept], keys[kept], weights[kept]
+        _, first, households = np.unique(
+            np.column_stack([keys, weights]), axis=0, return_index=True,
+            return_counts=True)
+        profiles = counts[first] * weights[first, None]
+    rng = np.random.default_rng(seed)
+    n = households.sum()
+    values = np.empty(replicates)
+    for start in range(0, replicates, batch):
+        size = min(batch, replicates - start)
+        draws = rng.multinomial(n, households / n, size=size)
+        values[start:start + size] = index_from_counts(draws @ profiles)
+    tail = (1 - level) / 2 * 100
+    low, high = np.nanpercentile(values, [tail, 100 - tail])
+    return AccessIndex(float(index_from_counts(households @ profiles)),
+                       float(low), float(high), values)
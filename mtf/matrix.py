@@ -0,0 +1,114 @@
+"""Attribute by tier count matrices.
+
+The notebooks fill ``df_plot`` cell by cell from one ``value_counts()`` per
+attribute, then do it again after collapsing the composite labels
+(``'3&4'`` becomes ``'3'``).  Here the wide tier table is melted once into
+(attribute, tier) pairs and cross-tabulated in one grouped pass, which
+yields the household counts and the weight totals together; the collapsed
+matrix adds up the columns of the raw one, so every variant comes from the
+same pass.  Tiers always come in the same order, from the lowest tier up,
+with the missing households last.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .profiling import instrumented
+from .tiers import MISSING, _lowest, _ordered
+from .weights import check_weights, split_weights
+
+#: Tiers of the collapsed matrices.
+COLLAPSED_TIERS = ['0', '1', '2', '3', '4', '5']
+
+
+def melt_tiers(tiers, attributes=None):
+    """Long form of a tier table: one (attribute, tier) pair per cell.
+
+    Both columns are categoricals; tiers follow a fixed order over all the
+    attributes, from the lowest tier up and the missing label last.
+    """
+    if attributes is None:
+        attributes = list(tiers.columns)
+    columns = [pd.Categorical(tiers[attribute]) for attribute in attributes]
+    order = _ordered([label for column in columns
+                      for label in column.categories], MISSING)
+    # Recode every column onto the shared categories, without going
+    # through the labels of the individual households.
+    codes = np.concatenate([
+        np.array([order.index(label) for label in column.categories] + [-1],
+                 dtype=np.int16)[column.codes]
+        for column in columns]) if columns else np.array([], dtype=np.int16)
+    return pd.DataFrame({
+        'attribute': pd.Categorical.from_codes(
+            np.repeat(np.arange(len(attributes)), len(tiers)),
+            categories=attributes),
+        'tier': pd.Categorical.from_codes(codes, categories=order),
+    })
+
+
+def collapse(matrix):
+    """Add up the columns of ``matrix`` by the lowest tier of their label.
+
+    ``'0,1&2'`` counts as tier 0 and ``'3&4'`` as tier 3, as in the
+    notebooks; the missing column is dropped.
+    """
+    floors = {label: str(_lowest(label)) for label in matrix.columns
+              if label != MISSING and _lowest(label) is not None}
+    collapsed = matrix[list(floors)].T.groupby(
+        pd.Series(floors)).sum().T
+    return collapsed.reindex(columns=COLLAPSED_TIERS, fill_value=0)
+
+
+@instrumented('aggregation')
+def tier_matrix(tiers, attributes=None, weights=None, missing=False):
+    """Households per attribute and tier, raw and collapsed.
+
+    Parameters
+    ----------
+    tiers : pandas.DataFrame
+        Categorical tier table, one row per household.
+    attributes : list of str, optional
+        Columns to count; all of them by default.
+    weights : pandas.Series, optional
+        Weight of every household, aligned on ``tiers``; the ``weight``
+        column of ``tiers`` by default.  Adds the weighted variants;
+        households without a weight are left out of them, see
+        :func:`~mtf.weights.check_weights`.
+    missing : bool
+        Keep the column of missing households in the raw matrices.
+
+    Returns
+    -------
+    dict
+        ``'raw'`` and ``'collapsed'`` count matrices, plus ``'weighted'``
+        and ``'weighted_collapsed'`` when ``weights`` are given.  Rows are
+        attributes and columns tiers.
+    """
+    tiers, weight = split_weights(tiers, weights)
+    if attributes is None:
+        attributes = list(tiers.columns)
+    long = melt_tiers(tiers, attributes)
+    weighted = weight is not None
+    if weighted:
+        # Households without a weight count as 0 in the weighted matrices,
+        # with the same warning as the other weighted counts.
+        weight = np.where(check_weights(weight), weight, 0)
+    else:
+        weight = np.ones(len(tiers))
+    # Counts and weight totals of every (attribute, tier) cell at once;
+    # unlike pd.crosstab this does not build one frame per statistic.
+    cells = pd.Series(np.tile(weight, len(attributes))).groupby(
+        [long['attribute'], long['tier']], observed=False).agg(['size', 'sum'])
+    matrices = {'raw': cells['size'].unstack()}
+    if weighted:
+        matrices['weighted'] = cells['sum'].unstack()
+    for name, collapsed in (('raw', 'collapsed'),
+                            ('weighted', 'weighted_collapsed')):
+        if name not in matrices:
+            continue
+        matrix = matrices[name]
+        matrix.index.name = matrix.columns.name = None
+        matrices[collapsed] = collapse(matrix)
+        if not missing:
+            matrices[name] = matrix.drop(columns=MISSING, errors='ignore')
+    return matrices
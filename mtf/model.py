@@ -0,0 +1,84 @@
+"""Typed representation of survey answers and tiers.
+
+The notebooks replace NaN with the string ``'Missing_data'`` inside numeric
+columns, which turns every column into ``object`` and every comparison into
+a Python-level check.  Here answers stay numeric and tiers stay categorical:
+
+* answers are nullable ``Float64`` columns where blanks, ``"Don't know"``
+  and the 888 code are ``<NA>``;
+* tiers are categoricals in which :data:`~mtf.tiers.MISSING` is a category
+  like any other, so that missing households are still counted.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .profiling import instrumented
+from .tiers import MISSING
+
+#: Spellings of "Don't know" found in the exported datasets.
+DONT_KNOW = ("Don't know", 'Don?t know', "don't know")
+
+#: Numeric code used by the questionnaire for "Don't know".
+DONT_KNOW_CODE = 888
+
+
+@instrumented('cleaning')
+def numeric_answers(df, columns, dont_know=None,
+                    missing_codes=(DONT_KNOW_CODE,), dtype='Float64'):
+    """Return ``df[columns]`` as nullable numeric columns.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Survey data.
+    columns : iterable of str
+        Columns to convert.
+    dont_know : float, optional
+        Value given to "Don't know" answers.  Missing by default; the Rwanda
+        availability analysis counts them as 0 hours.
+    missing_codes : sequence of float
+        Numeric codes that also mean missing.
+    dtype : str
+        Target dtype, ``'Float64'`` or ``'float32'`` for plain NaN floats.
+    """
+    out = {}
+    for column in columns:
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values.dtype):
+            array = values.to_numpy(dtype=float, na_value=np.nan, copy=True)
+        else:
+            # Survey answers repeat a handful of strings: convert each
+            # distinct answer once and broadcast back with the codes.
+            codes, uniques = pd.factorize(values)
+            uniques = pd.Series(uniques, dtype=object)
+            if dont_know is not None:
+                uniques = uniques.where(~uniques.isin(DONT_KNOW), dont_know)
+            uniques = pd.to_numeric(uniques, errors='coerce')
+            array = np.append(uniques.to_numpy(dtype=float, na_value=np.nan),
+                              np.nan)[codes]
+        for code in missing_codes:
+            array[array == code] = np.nan
+        out[column] = pd.Series(array, index=df.index).astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+
+def tier_dtype(table):
+    """Return the categorical dtype of the tiers produced by ``table``."""
+    return pd.CategoricalDtype(table.categories)
+
+
+def without_missing(tiers, missing=MISSING):
+    """Drop the missing households and the missing category from ``tiers``."""
+    tiers = tiers[tiers != missing]
+    if missing in tiers.cat.categories:
+        tiers = tiers.cat.remove_categories(missing)
+    return tiers
+
+
+def memory_per_household(frame):
+    """Bytes used by ``frame`` per row, object payloads included."""
+    if not len(frame):
+        return 0.
+    usage = frame.memory_usage(index=False, deep=True)
+    return float(np.sum(usage)) / len(frame)
@@ -0,0 +1,163 @@
+"""Figures of the reports.
+
+Figures are built on :class:`matplotlib.figure.Figure` directly rather than
+through pyplot, so they are drawn off-screen and never touch the notebook's
+current figure or backend.
+
+:func:`render_figures` draws the figures of a whole tier table, with and
+without the missing households, in a process pool with the Agg canvas.
+Every PNG is stored under the hash of what it shows (the title and the tier
+counts) and of this module, so a figure whose counts did not change is not
+drawn again.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .data import CACHE_DIR, ROOT
+from .profiling import instrumented
+from .tiers import MISSING
+from .weights import split_weights, tier_counts
+
+#: Where rendered figures are stored.
+FIGURE_DIR = ROOT / CACHE_DIR / 'figures'
+
+#: ESMAP colour palette used by all the reports.
+ESMAP_COLORS = ['#864241', '#B85F57', '#E49202', '#5797B0', '#84B0B1',
+                '#5C9989']
+
+
+def tier_figure(counts, title):
+    """Pie and bar chart of tier counts, like the notebook cells.
+
+    Parameters
+    ----------
+    counts : pandas.Series
+        Households per tier label.
+    title : str
+        Title of both panels.
+    """
+    from matplotlib.figure import Figure
+
+    counts = counts[counts > 0]
+    colors = [ESMAP_COLORS[i % len(ESMAP_COLORS)] for i in range(len(counts))]
+    figure = Figure(figsize=(18, 6))
+    pie, bar = figure.subplots(1, 2)
+    if len(counts):
+        pie.pie(counts.to_numpy(),
+                labels=[str(label) for label in counts.index],
+                autopct='%1.0f%%', colors=colors)
+    else:
+        pie.text(0.5, 0.5, 'No data', ha='center', va='center')
+        pie.set_axis_off()
+    pie.set_title(title)
+    bar.bar([str(label) for label in counts.index], counts.to_numpy(),
+            color=colors)
+    bar.set_xlabel('TIER')
+    bar.set_ylabel('Households')
+    bar.set_title(title)
+    return figure
+
+
+def count_figure(counts, title):
+    """Bar chart of counts by label, like the primary fuel cell of the
+    cooking notebook."""
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(18, 6))
+    bar = figure.subplots()
+    bar.bar([str(label) for label in counts.index], counts.to_numpy(),
+            width=1, color=ESMAP_COLORS[3])
+    bar.tick_params(axis='x', labelrotation=90)
+    bar.set_title(title)
+    figure.tight_layout()
+    return figure
+
+
+def figure_key(counts, title):
+    """Hash of a figure: its title, its tier counts and the drawing code."""
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    digest.update(json.dumps([title, [str(label) for label in counts.index],
+                              [float(value) for value in counts]]).encode())
+    return digest.hexdigest()[:16]
+
+
+def _render(job, draw=tier_figure):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    counts, title, path = job
+    figure = draw(counts, title)
+    FigureCanvasAgg(figure)
+    partial = path.with_name(path.name + '.partial')
+    figure.savefig(partial, format='png')
+    partial.replace(path)
+    return path
+
+
+@instrumented('plotting')
+def render_figures(tiers, titles=None, directory=FIGURE_DIR, processes=None):
+    """Render the figures of every column of ``tiers``.
+
+    Each column gets two figures, named after it, with and without the
+    missing households (``<column>_without_missing``).  Households count by
+    their weight when the table has a ``weight`` column.
+
+    Parameters
+    ----------
+    tiers : pandas.DataFrame
+        Categorical tier table.
+    titles : dict, optional
+        Title of every column; the column name by default.
+    directory : str or Path
+        Figure cache.
+    processes : int, optional
+        Worker processes; all CPUs by default.  Figures already in the
+        cache are not drawn again.
+
+    Returns
+    -------
+    dict
+        Path of the PNG of every figure name.
+    """
+    titles = titles or {}
+    tiers, weights = split_weights(tiers)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths, jobs, pending = {}, [], set()
+    for column in tiers.columns:
+        title = titles.get(column, column)
+        counts = tier_counts(tiers[column], weights)
+        for name, counts in ((column, counts),
+                             (column + '_without_missing',
+                              counts.drop(MISSING, errors='ignore'))):
+            path = directory / (figure_key(counts, title) + '.png')
+            paths[name] = path
+            if not path.exists() and path not in pending:
+                pending.add(path)
+                jobs.append((counts, title, path))
+    if len(jobs) > 1 and processes != 1:
+        with ProcessPoolExecutor(processes) as pool:
+            list(pool.map(_render, jobs))
+    else:
+        for job in jobs:
+            _render(job)
+    return paths
+
+
+@instrumented('plotting')
+def render_counts(counts, title, directory=FIGURE_DIR):
+    """Render the :func:`count_figure` of ``counts``, or reuse it.
+
+    Returns
+    -------
+    pathlib.Path
+        PNG in the figure cache, keyed like the tier figures.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / ('counts-%s.png' % figure_key(counts, title))
+    if not path.exists():
+        _render((counts, title, path), count_figure)
+    return path
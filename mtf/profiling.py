@@ -0,0 +1,193 @@
+"""Stage timings of the analysis pipeline.
+
+The main steps of the pipeline (ingestion, cleaning, attribute tiering,
+aggregation, plotting and export) are wrapped with :func:`instrumented`.
+Profiling is off by default: a wrapped function then costs one extra call
+and a global lookup.  Within :func:`profiled`, every stage records its wall
+time, CPU time, the rows it returned and, with ``memory=True``, its peak
+allocated memory (through :mod:`tracemalloc`)::
+
+    with profiled(memory=True) as trace:
+        electricity_tiers(main_dataset())
+    trace.to_chrome('trace.json')   # chrome://tracing or Perfetto
+
+Stages may nest; a stage's peak includes the stages it calls.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+#: Stage categories, in pipeline order.
+CATEGORIES = ['ingestion', 'cleaning', 'tiering', 'aggregation', 'plotting',
+              'export']
+
+_active = None
+_NULL = nullcontext()
+
+
+class Span:
+    """One run of a stage."""
+
+    __slots__ = ('name', 'category', 'start', 'wall', 'cpu', 'rows',
+                 'peak_bytes', 'depth', '_base', '_peak')
+
+    def __init__(self, name, category, depth):
+        self.name = name
+        self.category = category
+        self.depth = depth
+        self.start = self.wall = self.cpu = 0.
+        self.rows = self.peak_bytes = None
+
+    def as_dict(self):
+        return {'name': self.name, 'category': self.category,
+                'start': self.start, 'wall': self.wall, 'cpu': self.cpu,
+                'rows': self.rows, 'peak_bytes': self.peak_bytes,
+                'depth': self.depth}
+
+
+class Trace:
+    """Spans recorded while profiling is on.
+
+    Parameters
+    ----------
+    memory : bool
+        Also record the peak allocated memory of every stage; this slows
+        Python-level allocations down.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.spans = []
+        self._stack = []
+        self._origin = time.perf_counter()
+
+    def __repr__(self):
+        return 'Trace(%d spans)' % len(self.spans)
+
+    @contextmanager
+    def stage(self, name, category):
+        span = Span(name, category, len(self._stack))
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent._peak = max(parent._peak, peak)
+            tracemalloc.reset_peak()
+            span._base = span._peak = current
+        self._stack.append(span)
+        cpu = time.process_time()
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.wall = time.perf_counter() - start
+            span.cpu = time.process_time() - cpu
+            span.start = start - self._origin
+            self._stack.pop()
+            if self.memory:
+                peak = max(span._peak, tracemalloc.get_traced_memory()[1])
+                span.peak_bytes = peak - span._base
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent._peak = max(parent._peak, peak)
+            self.spans.append(span)
+
+    def summary(self):
+        """Total wall and CPU time, rows and peak memory per stage."""
+        import pandas as pd
+        frame = pd.DataFrame([span.as_dict() for span in self.spans])
+        if frame.empty:
+            return frame
+        return frame.groupby(['category', 'name'], sort=False).agg(
+            calls=('wall', 'size'), wall=('wall', 'sum'), cpu=('cpu', 'sum'),
+            rows=('rows', 'sum'), peak_bytes=('peak_bytes', 'max'))
+
+    def to_json(self, path=None):
+        """Spans as a list of dicts, written to ``path`` when given."""
+        records = [span.as_dict() for span in self.spans]
+        if path is not None:
+            with open(path, 'w') as stream:
+                json.dump(records, stream, indent=1)
+        return records
+
+    def to_chrome(self, path=None):
+        """Spans in the Chrome trace event format, see ``to_json``."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = {'traceEvents': [
+            {'name': span.name, 'cat': span.category, 'ph': 'X',
+             'ts': span.start * 1e6, 'dur': span.wall * 1e6,
+             'pid': pid, 'tid': tid,
+             'args': {'cpu': span.cpu, 'rows': span.rows,
+                      'peak_bytes': span.peak_bytes}}
+            for span in self.spans], 'displayTimeUnit': 'ms'}
+        if path is not None:
+            with open(path, 'w') as stream:
+                json.dump(events, stream)
+        return events
+
+
+def stage(name, category):
+    """Context manager timing a block as a stage; a no-op when off."""
+    if _active is None:
+        return _NULL
+    return _active.stage(name, category)
+
+
+def _rows(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def instrumented(category, name=None):
+    """Decorator recording every call of a function as a stage.
+
+    Parameters
+    ----------
+    category : str
+        One of :data:`CATEGORIES`.
+    name : str, optional
+        Stage name, the qualified name of the function by default.
+    """
+    if category not in CATEGORIES:
+        raise ValueError('unknown stage category %r' % category)
+
+    def decorate(function):
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            with _active.stage(label, category) as span:
+                result = function(*args, **kwargs)
+                span.rows = _rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def profiled(memory=False):
+    """Turn profiling on within the block and yield its :class:`Trace`."""
+    global _active
+    previous = _active
+    trace = Trace(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    _active = trace
+    try:
+        yield trace
+    finally:
+        _active = previous
+        if started:
+            tracemalloc.stop()
@@ -0,0 +1,277 @@
+"""Headless report runner.
+
+Computes the tier table of a book once and stores it, with its counts,
+attribute by tier matrices and figures, in a content-addressed cache: the
+entry is named after the hash of the input data, of ``P.csv`` and of the
+``mtf`` source code, so an unchanged dataset and unchanged code reuse the
+previous run.  Every household counts by its ``sample_weight`` from
+``P.csv``: the counts, matrices, figures and Access Index of the report,
+bootstrap interval included, are weighted.
+
+There is one report per Jupyter Book: ``electricity`` (``Rwanda/RE``, from
+``Main_dataset.csv``) and ``cooking`` (``Rwanda/RC``, from the main and
+section I sheets of ``dataset.xlsx``, with the primary fuel counts in
+``fuels.csv``).  The book notebooks call :func:`run` and only read the
+cached artifacts back with :func:`load_report`, :func:`load_manifest` and
+:func:`report_file`.
+
+The manifest records the Access Index over all the attributes of the book,
+evening availability included for electricity; it is not the index of the
+original notebooks, see :mod:`mtf.index`.
+
+Run from the repository root::
+
+    python -m mtf.report [--book cooking] [--data Main_dataset.csv]
+                         [--force] [--no-figures] [--trace trace.json]
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from .cooking import (COOKING_ATTRIBUTES, FUELS, HOUSEHOLD_COLUMN,
+                      StoveLinkage, cooking_tiers)
+from .data import (CONVERTED_SECTIONS, MAIN_DATASET, ROOT, file_hash,
+                   main_dataset, main_households)
+from .electricity import ATTRIBUTES, electricity_tiers
+from .index import access_index_bounds, bootstrap_access_index
+from .matrix import tier_matrix
+from .plotting import render_counts, render_figures
+from .profiling import instrumented, profiled
+from .weights import (WEIGHT, attach_weights, load_weights, split_weights,
+                      tier_counts)
+
+#: Where report entries are stored.
+REPORT_DIR = ROOT / '.mtf_cache' / 'reports'
+
+#: Workbook of the cooking book, with the ``main_dataset`` and ``I`` sheets.
+COOKING_DATASET = ROOT / 'Rwanda' / 'dataset.xlsx'
+
+#: Figure titles of every column of the tier table.
+TITLES = {
+    'Capacity': 'TIER levels based on power capacity',
+    'Availability': 'TIER levels based on day and night power availability',
+    'Evening_Availability': 'TIER levels based on evening power availability',
+    'Reliability': 'TIER levels based on reliability',
+    'Quality': 'TIER levels based on power quality',
+    'Formality': 'TIER levels based on formality',
+    'Health_Safety': 'TIER levels based on Health and safety',
+    'MTF': 'Aggregate MTF TIER levels',
+}
+
+#: Figure titles of the cooking tier table.
+COOKING_TITLES = {
+    'Emission': 'TIER levels based on cooking exposure',
+    'Convenience': 'TIER levels based on cooking Convenience',
+    'Safety': 'TIER levels based on Safety of Primary Cookstove',
+    'Fuel_Availability': 'TIER levels based on Fuel Availability',
+}
+
+
+#: Title of the primary fuel chart of the cooking book.
+FUEL_TITLE = 'Primary fuels used'
+
+
+def _electricity(dataset):
+    data = main_dataset(dataset)
+    # Main_dataset.csv numbers its rows; their HHIDs come from section P.
+    households = None if 'HHID' in data.columns else main_households()
+    tiers = electricity_tiers(data, households=households)
+    return attach_weights(tiers, load_weights()), {}
+
+
+def _cooking(dataset):
+    sheets = pd.read_excel(dataset, sheet_name=['main_dataset', 'I'])
+    main = sheets['main_dataset']
+    tiers = attach_weights(cooking_tiers(main, sheets['I']), load_weights(),
+                           households=main[HOUSEHOLD_COLUMN])
+    linkage = StoveLinkage(main[HOUSEHOLD_COLUMN], sheets['I'])
+    fuels = linkage.fuel_counts(weights=tiers[WEIGHT])
+    fuels.index = [FUELS[code] for code in fuels.index]
+    return tiers, {'fuels': (fuels, FUEL_TITLE)}
+
+
+#: Every book: default dataset, function returning the tier table and the
+#: other counts of the book (name: (counts, title)), attributes of the
+#: Access Index and figure titles.
+BOOKS = {
+    'electricity': (MAIN_DATASET, _electricity, ATTRIBUTES, TITLES),
+    'cooking': (COOKING_DATASET, _cooking, COOKING_ATTRIBUTES,
+                COOKING_TITLES),
+}
+
+_PACKAGE = Path(__file__).resolve().parent
+
+
+def code_hash():
+    """Hash of the source files of the ``mtf`` package."""
+    digest = hashlib.sha256()
+    for path in sorted(_PACKAGE.rglob('*.py')):
+        digest.update(path.relative_to(_PACKAGE).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def report_key(inputs, **options):
+    """Content address of a report over the ``inputs`` files.
+
+    ``options`` that change the artifacts (e.g. ``figures``) are hashed too.
+    """
+    digest = hashlib.sha256(code_hash().encode())
+    for path in inputs:
+        digest.update(file_hash(path).encode())
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+@instrumented('export', 'report')
+def _write(entry, tiers, figures, titles, views=None):
+    tiers.to_pickle(entry / 'tiers.pkl')
+    table, weights = split_weights(tiers)
+    counts = pd.DataFrame({column: tier_counts(table[column], weights)
+                           for column in table.columns}).fillna(0)
+    if weights is None:
+        counts = counts.astype(int)
+    counts.to_csv(entry / 'counts.csv')
+    matrices = tier_matrix(tiers, missing=True)
+    matrices['raw'].to_csv(entry / 'matrix.csv')
+    matrices['collapsed'].to_csv(entry / 'collapsed.csv')
+    outputs = ['tiers.pkl', 'counts.csv', 'matrix.csv', 'collapsed.csv']
+    views = views or {}
+    for name, (counts, _) in views.items():
+        counts.to_csv(entry / (name + '.csv'))
+        outputs.append(name + '.csv')
+    if figures:
+        (entry / 'figures').mkdir()
+        rendered = render_figures(tiers, titles)
+        for name, (counts, title) in views.items():
+            rendered[name] = render_counts(counts, title)
+        for name, cached in rendered.items():
+            path = Path('figures') / (name + '.png')
+            shutil.copyfile(cached, entry / path)
+            outputs.append(path.as_posix())
+    return outputs
+
+
+def _book(book):
+    if book not in BOOKS:
+        raise ValueError('book must be one of %s, not %r'
+                         % (', '.join(BOOKS), book))
+    return BOOKS[book]
+
+
+def run(dataset=None, output=REPORT_DIR, figures=True, force=False,
+        book='electricity'):
+    """Compute (or reuse) the report of ``dataset``.
+
+    Parameters
+    ----------
+    dataset : str or pathlib.Path, optional
+        Input of the book, its default dataset if omitted.
+    output : str or pathlib.Path
+        Cache directory.
+    figures : bool
+        Render the figures of every attribute too.
+    force : bool
+        Recompute even if the report is cached.
+    book : {'electricity', 'cooking'}
+        Report to compute.
+
+    Returns
+    -------
+    pathlib.Path
+        Directory of the cache entry.
+    """
+    default, compute, attributes, titles = _book(book)
+    dataset = Path(default if dataset is None else dataset)
+    output = Path(output)
+    key = report_key([dataset, CONVERTED_SECTIONS['P']], figures=figures,
+                     book=book)
+    entry = output / key
+    if force and entry.exists():
+        shutil.rmtree(entry)
+    if not entry.exists():
+        output.mkdir(parents=True, exist_ok=True)
+        # Build in a scratch directory so an interrupted run leaves nothing.
+        scratch = Path(tempfile.mkdtemp(dir=output, prefix='.' + key))
+        try:
+            tiers, views = compute(dataset)
+            outputs = _write(scratch, tiers, figures, titles, views)
+            weighted = tiers[attributes + [WEIGHT]]
+            index = bootstrap_access_index(weighted, seed=0)
+            manifest = {'key': key, 'book': book, 'dataset': str(dataset),
+                        'attributes': attributes, 'outputs': outputs,
+                        'access_index': {'index': index.index,
+                                         'low': index.low,
+                                         'high': index.high,
+                                         'bounds': access_index_bounds(
+                                             weighted)}}
+            (scratch / 'manifest.json').write_text(
+                json.dumps(manifest, indent=1))
+            scratch.rename(entry)
+        except BaseException:
+            shutil.rmtree(scratch, ignore_errors=True)
+            raise
+    (output / ('latest-%s' % book)).write_text(key)
+    return entry
+
+
+def report_file(name, output=REPORT_DIR, key=None, book='electricity'):
+    """Path of the ``name`` artifact of a cached report, the latest of
+    ``book`` by default (e.g. ``'counts.csv'``, ``'figures/MTF.png'``).
+    """
+    _book(book)
+    output = Path(output)
+    if key is None:
+        key = (output / ('latest-%s' % book)).read_text().strip()
+    return output / key / name
+
+
+def load_report(output=REPORT_DIR, key=None, book='electricity'):
+    """Return the tier table of a cached report, the latest by default."""
+    return pd.read_pickle(report_file('tiers.pkl', output, key, book))
+
+
+def load_manifest(output=REPORT_DIR, key=None, book='electricity'):
+    """Return the manifest of a cached report: its inputs, outputs and
+    Access Index.
+    """
+    return json.loads(report_file('manifest.json', output, key,
+                                  book).read_text())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m mtf.report',
+        description='Compute the MTF tiers of a book and their figures.')
+    parser.add_argument('--book', default='electricity', choices=list(BOOKS),
+                        help='report to compute (default: %(default)s)')
+    parser.add_argument('--data', type=Path,
+                        help='input of the book (default: Main_dataset.csv '
+                             'or dataset.xlsx)')
+    parser.add_argument('--output', default=REPORT_DIR, type=Path,
+                        help='cache directory (default: %(default)s)')
+    parser.add_argument('--no-figures', dest='figures', action='store_false',
+                        help='only compute the tier tables')
+    parser.add_argument('--force', action='store_true',
+                        help='recompute even if the report is cached')
+    parser.add_argument('--trace', type=Path,
+                        help='write a Chrome trace of the stages to TRACE')
+    args = parser.parse_args(argv)
+    if args.trace is None:
+        print(run(args.data, args.output, figures=args.figures,
+                  force=args.force, book=args.book))
+        return
+    with profiled() as trace:
+        print(run(args.data, args.output, figures=args.figures,
+                  force=args.force, book=args.book))
+    trace.to_chrome(args.trace)
+
+
+if __name__ == '__main__':
+    main()
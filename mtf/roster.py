@@ -0,0 +1,131 @@
+"""Household features from the roster (section A).
+
+``A.csv`` has one row per household member: sex (A3), relationship to the
+head (A4) and age (A5), among others.  :func:`household_features` reduces
+it to one row per household in a single grouped pass over the HHID-sorted
+members: household size, sex and age of the head and dependency ratio.
+
+The feature table is indexed by HHID, like the tier tables, so joining it
+(:func:`join_features`) is an index lookup, and its columns can be passed
+as groups to :func:`~mtf.survey.weighted_shares`::
+
+    features = household_features()
+    weighted_shares(tiers, by=join_features(tiers, features)['Head_Sex'])
+
+Both the csv export (numeric codes) and ``Section A.dta`` (value labels)
+are understood.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .data import converted_section
+from .profiling import instrumented
+
+#: Roster columns: sex, relationship to the head and age of every member.
+ROSTER_COLUMNS = {'sex': 'A3', 'relation': 'A4', 'age': 'A5'}
+
+#: Codes and value labels of the head of household (A4).
+HEAD = (1, 'Head')
+
+#: Sexes by code (A3); the Stata labels are the values.
+SEXES = {1: 'Male', 2: 'Female'}
+
+#: Working ages, bounds included; members younger or older are dependents.
+WORKING_AGES = (15, 64)
+
+#: Columns of the feature table.
+FEATURES = ['Household_Size', 'Head_Sex', 'Head_Age', 'Dependency_Ratio']
+
+
+def _codes(values, labels):
+    """Numeric codes of a roster column given as codes or value labels."""
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    codes = pd.to_numeric(values, errors='coerce')
+    named = values.map({label: code for code, label in labels.items()})
+    return codes.fillna(named).to_numpy(dtype=float, na_value=np.nan)
+
+
+@instrumented('cleaning')
+def household_features(section_a=None, household='HHID', sex='A3',
+                       relation='A4', age='A5'):
+    """Return the roster features of every household.
+
+    Parameters
+    ----------
+    section_a : pandas.DataFrame or mtf.data.Dataset, optional
+        Section A, one row per member, ``A.csv`` by default.
+    household, sex, relation, age : str
+        HHID, sex (A3), relationship to the head (A4) and age (A5) columns.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by sorted HHID, with
+
+        - ``Household_Size``: members listed (int16);
+        - ``Head_Sex``: ``'Male'``/``'Female'`` categorical of the first
+          member listed as head, missing without one;
+        - ``Head_Age``: age of that member (float32, NaN if unknown);
+        - ``Dependency_Ratio``: members younger than 15 or older than 64
+          per member of working age (float32, NaN without working-age
+          members or with unknown ages).
+    """
+    if section_a is None:
+        section_a = converted_section('A')
+    rows = section_a[[household, sex, relation, age]]
+    ages = pd.to_numeric(rows[age], errors='coerce').to_numpy(dtype=float,
+                                                             na_value=np.nan)
+    head = _codes(rows[relation], dict([HEAD])) == HEAD[0]
+    working = (ages >= WORKING_AGES[0]) & (ages <= WORKING_AGES[1])
+    members = pd.DataFrame({
+        'size': 1,
+        'unknown_age': np.isnan(ages),
+        'working': working,
+        'dependents': ~working & ~np.isnan(ages),
+        # Only the head rows carry a sex and age; 'first' skips the NaNs.
+        'head_sex': np.where(head, _codes(rows[sex], SEXES), np.nan),
+        'head_age': np.where(head, ages, np.nan),
+    }, index=pd.Index(rows[household].to_numpy(dtype=np.int64),
+                      name=household))
+    totals = members.groupby(level=0, sort=True).agg(
+        size=('size', 'sum'), unknown_age=('unknown_age', 'sum'),
+        working=('working', 'sum'), dependents=('dependents', 'sum'),
+        head_sex=('head_sex', 'first'), head_age=('head_age', 'first'))
+    known = (totals['working'] > 0) & (totals['unknown_age'] == 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(known, totals['dependents'] / totals['working'],
+                         np.nan)
+    return pd.DataFrame({
+        'Household_Size': totals['size'].astype(np.int16),
+        'Head_Sex': pd.Categorical(totals['head_sex'].map(SEXES),
+                                   categories=list(SEXES.values())),
+        'Head_Age': totals['head_age'].astype(np.float32),
+        'Dependency_Ratio': ratio.astype(np.float32),
+    }, index=totals.index)
+
+
+def join_features(tiers, features, households=None):
+    """Feature rows of every household of ``tiers``, aligned on its rows.
+
+    Parameters
+    ----------
+    tiers : pandas.DataFrame
+        Tier table.
+    features : pandas.DataFrame
+        Output of :func:`household_features`.
+    households : array-like, optional
+        HHID of every row of ``tiers``; its index by default.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed like ``tiers``; households absent from the roster get
+        missing features.
+    """
+    households = tiers.index if households is None else households
+    joined = features.reindex(pd.Index(households))
+    joined.index = tiers.index
+    return joined
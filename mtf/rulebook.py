@@ -0,0 +1,368 @@
+"""Versioned MTF rulebooks.
+
+A rulebook is a set of tier tables, one per attribute, together with the
+questions that feed each attribute.  The questions come from the indicator
+spreadsheets shipped with the Rwanda data:
+
+* ``Attributes indicators_Rwanda (Section C).xlsx`` for electricity,
+* ``Attributes_Cookstoves_Rwanda.xlsx`` for cooking.
+
+The spreadsheets do not hold the thresholds, which differ between the
+analyses: the electricity notebooks bin daily capacity at 12/200/1000/3400/
+8200 Wh while ``MTF-Electricity.ipynb`` uses 3/50/200/800/2000.  Each
+version in :data:`VERSIONS` keeps its own tables.
+
+The questions of the spreadsheet decide the inputs of a rulebook: an
+answer column of the engine (:data:`~mtf.electricity.ATTRIBUTE_COLUMNS`) is
+used only when the spreadsheet lists its question for that attribute.
+
+Compiling a rulebook (parsing the spreadsheet and checking the tables
+against it) is done once; the result is pickled under ``.mtf_cache``, keyed
+by the hash of the spreadsheet, of the tables and of the code building
+them, and reused afterwards.  :func:`evaluate` reads the answers once and
+computes the indicators once per distinct set of inputs and outage rules.
+"""
+
+import hashlib
+import pickle
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import electricity, tiers
+from .data import CACHE_DIR, ROOT, file_hash
+from .electricity import (ATTRIBUTE_COLUMNS, FORMALITY_TIERS,
+                          HEALTH_SAFETY_TIERS, QUALITY_TIERS,
+                          RELIABILITY_TIERS, TIER_TABLES, _read,
+                          _reliability_table, classify_indicators,
+                          electricity_indicators)
+from .model import DONT_KNOW, DONT_KNOW_CODE
+from .tiers import (COOKING_CONVENIENCE_TIERS, DAY_AVAILABILITY_TIERS,
+                    CodeTable, OutageTable, TierTable)
+
+#: Indicator spreadsheet and sheet of every domain.
+SPREADSHEETS = {
+    'electricity': (ROOT / 'Rwanda'
+                    / 'Attributes indicators_Rwanda (Section C).xlsx',
+                    'Supply of electricity'),
+    'cooking': (ROOT / 'Rwanda' / 'Attributes_Cookstoves_Rwanda.xlsx',
+                'Cooking solutions'),
+}
+
+#: Where compiled rulebooks are stored.
+RULEBOOK_DIR = ROOT / CACHE_DIR / 'rulebooks'
+
+#: Attribute names of the spreadsheets that differ from ours.
+ATTRIBUTE_NAMES = {
+    'Health and Safety': 'Health_Safety',
+    'Cooking exposure': 'Exposure',
+    'Cookstove effiviency': 'Efficiency',
+    'Fuel Availability': 'Fuel_Availability',
+    'Electricity source used more': 'Main_Source',
+}
+
+_QUESTION = re.compile(r'\s*([A-Za-z]\d+)([ab])?(?![0-9A-Za-z])')
+
+#: Worst and typical month suffix of an answer column (``C119A``).
+_MONTH = re.compile(r'(?<=\d)[AB]$')
+
+#: Modules whose code shapes a compiled rulebook, hashed into its key.
+_SOURCES = (Path(__file__), Path(tiers.__file__), Path(electricity.__file__))
+
+#: Tier tables of every rulebook version.
+VERSIONS = {
+    # Rwanda_MTF_Electricity.ipynb and the cooking notebooks.
+    'rwanda': {
+        'domain': 'electricity',
+        'tables': TIER_TABLES,
+    },
+    # MTF-Electricity.ipynb: capacity cut-offs in W, unanswered questions
+    # counted as tier 0, damaged appliances ("Yes") as tier 5 and the
+    # outages tiered on their number alone.
+    'mtf-electricity': {
+        'domain': 'electricity',
+        'missing_tier': '0',
+        'tables': {
+            'Capacity': TierTable([3, 50, 200, 800, 2000],
+                                  ['0', '1', '2', '3', '4', '5']),
+            'Availability': TierTable([4, 8, 16, 23],
+                                      ['0', '1', '3', '4', '5']),
+            'Evening_Availability': TierTable([1, 2, 3, 4],
+                                              ['0', '1', '2', '3', '4']),
+            'Reliability': OutageTable([('5', (0, 3), None),
+                                        ('3', (3, 14), None)], default='0'),
+            'Quality': CodeTable({'5': ['Yes', 1]}, default='0'),
+            'Formality': CodeTable(
+                {'0': ['No bill for electricity',
+                       'We never used electricity', 111]}, default='5'),
+            'Health_Safety': CodeTable({'0': ['Yes', 1]}, default='5'),
+        },
+    },
+    # Ethiopia_MTF_electricity.ipynb: no evening supply is tier 0 and the
+    # answers are lower case.
+    'ethiopia': {
+        'domain': 'electricity',
+        'tables': {
+            'Capacity': TIER_TABLES['Capacity'],
+            'Availability': DAY_AVAILABILITY_TIERS,
+            'Evening_Availability': TierTable([1, 2, 3, 4],
+                                              ['0', '1', '2', '3', '4&5']),
+            'Reliability': RELIABILITY_TIERS,
+            'Quality': CodeTable(
+                {'0,1,2&3': QUALITY_TIERS.labels['0,1,2&3'] + ['yes']},
+                default='4&5',
+                missing_values=DONT_KNOW + (DONT_KNOW_CODE,)),
+            'Formality': CodeTable(
+                {'0,1,2&3': FORMALITY_TIERS.labels['0,1,2&3']
+                 + ['no bill for electricity']}, default='4&5'),
+            'Health_Safety': CodeTable(
+                {'0,1,2&3': HEALTH_SAFETY_TIERS.labels['0,1,2&3'] + ['yes']},
+                default='4&5'),
+        },
+    },
+    'rwanda-cooking': {
+        'domain': 'cooking',
+        'tables': {'Convenience': COOKING_CONVENIENCE_TIERS},
+    },
+}
+
+#: Rulebook used by default for every country.
+COUNTRY_VERSIONS = {
+    'Rwanda': 'rwanda',
+    'Ethiopia': 'ethiopia',
+}
+
+
+def read_indicators(path, sheet):
+    """Return the questions behind every attribute of a spreadsheet.
+
+    Parameters
+    ----------
+    path : str or Path
+        Indicator spreadsheet.
+    sheet : str
+        Sheet listing the attributes.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``source``, ``attribute``, ``column`` (as named in the exports,
+        e.g. ``C26A`` for the worst month), ``question`` and ``unit``, one
+        row per question.
+    """
+    raw = pd.read_excel(path, sheet_name=sheet, header=None, dtype=object)
+    header = raw.index[raw.eq('Columns related').any(axis=1)][0]
+    table = raw.iloc[header + 1:].set_axis(raw.iloc[header], axis=1)
+    table = table.rename(columns={'Type': 'source',
+                                  'Attribute': 'attribute',
+                                  'Columns related': 'question',
+                                  'Unit of measurement': 'unit'})
+    if 'source' not in table.columns:
+        table['source'] = None
+    table[['source', 'attribute']] = table[['source', 'attribute']].ffill()
+    table = table.dropna(subset=['question'])
+
+    rows = []
+    for source, attribute, question, unit in table[
+            ['source', 'attribute', 'question', 'unit']].itertuples(
+                index=False):
+        attribute = ATTRIBUTE_NAMES.get(attribute.strip(),
+                                        attribute.strip().replace(' ', '_'))
+        text = question.lower()
+        if attribute == 'Availability' and 'even' in text:
+            attribute = 'Evening_Availability'
+        match = _QUESTION.match(question)
+        if match is None:
+            continue
+        column = match.group(1).upper()
+        if match.group(2):
+            # Worst and typical month questions end in A and B; the text
+            # is trusted over the letter, which is sometimes mistyped.
+            column += ('A' if 'worst' in text else
+                       'B' if 'typical' in text else match.group(2).upper())
+        rows.append((source, attribute, column, question.strip(),
+                     None if pd.isna(unit) else str(unit).strip()))
+    return pd.DataFrame(rows, columns=['source', 'attribute', 'column',
+                                       'question', 'unit'])
+
+
+class Rulebook:
+    """Tier tables of one version, with the questions of every attribute.
+
+    Parameters
+    ----------
+    version : str
+        Key of :data:`VERSIONS`.
+    indicators : pandas.DataFrame
+        Output of :func:`read_indicators`.
+    tables : dict
+        Tier table of every attribute, an
+        :class:`~mtf.tiers.OutageTable` for ``'Reliability'``; None for
+        attributes tiered by the rules of
+        :data:`~mtf.electricity.TIER_TABLES`.
+    domain : str
+        ``'electricity'`` or ``'cooking'``.
+    missing_tier : str, optional
+        Tier given to missing answers.
+
+    Raises
+    ------
+    ValueError
+        If a table has no question in the spreadsheet, or, for
+        electricity, no answer column among the questions.
+    """
+
+    def __init__(self, version, indicators, tables, domain='electricity',
+                 missing_tier=None):
+        self.version = version
+        self.indicators = indicators
+        self.tables = dict(tables)
+        self.domain = domain
+        self.missing_tier = missing_tier
+        unknown = [attribute for attribute in self.tables
+                   if attribute not in set(indicators['attribute'])]
+        if unknown:
+            raise ValueError('rulebook %r has tables for attributes without '
+                             'questions: %s' % (version, ', '.join(unknown)))
+        #: Answer columns of the engine used by every electricity attribute.
+        self.inputs = {}
+        if domain == 'electricity':
+            for attribute, columns in ATTRIBUTE_COLUMNS.items():
+                questions = set(self.columns(attribute))
+                self.inputs[attribute] = [
+                    column for column in columns
+                    if column in questions
+                    or _MONTH.sub('', column) in questions]
+            unused = [attribute for attribute, table in self.tables.items()
+                      if table is not None and not self.inputs[attribute]]
+            if unused:
+                raise ValueError('rulebook %r has no answer column for: %s'
+                                 % (version, ', '.join(unused)))
+
+    def __repr__(self):
+        return 'Rulebook(%r, %d attributes)' % (self.version, len(self.tables))
+
+    def columns(self, attribute):
+        """Questions of ``attribute``, over all sources."""
+        rows = self.indicators['attribute'] == attribute
+        return self.indicators.loc[rows, 'column'].tolist()
+
+    def unused(self):
+        """Answer columns of the engine that the spreadsheet does not list.
+        """
+        return [column for attribute, columns in ATTRIBUTE_COLUMNS.items()
+                for column in columns
+                if column not in self.inputs.get(attribute, columns)]
+
+    def classify(self, indicators):
+        """Tier table of the electricity ``indicators``."""
+        if self.domain != 'electricity':
+            tiers = pd.DataFrame(index=indicators.index)
+            for attribute, table in self.tables.items():
+                tiers[attribute] = table.classify(indicators[attribute].array)
+            return tiers
+        return classify_indicators(indicators, self.tables, self.missing_tier)
+
+
+def _key(version):
+    spec = VERSIONS[version]
+    path, sheet = SPREADSHEETS[spec['domain']]
+    digest = hashlib.sha256(file_hash(path).encode())
+    digest.update(sheet.encode())
+    for attribute, table in sorted(spec['tables'].items()):
+        digest.update(repr((attribute, table,
+                            getattr(table, 'missing_values', None))).encode())
+    digest.update(repr(spec.get('missing_tier')).encode())
+    # A change to the parsing or to the tables' classes would otherwise
+    # load the pickles of the old code.
+    for source in _SOURCES:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def compile_rulebook(version):
+    """Build the :class:`Rulebook` of ``version`` from its spreadsheet."""
+    try:
+        spec = VERSIONS[version]
+    except KeyError:
+        raise KeyError('no rulebook version %r' % version) from None
+    path, sheet = SPREADSHEETS[spec['domain']]
+    return Rulebook(version, read_indicators(path, sheet), spec['tables'],
+                    domain=spec['domain'],
+                    missing_tier=spec.get('missing_tier'))
+
+
+def load_rulebook(version=None, country='Rwanda', cache=True):
+    """Return a compiled rulebook, from the cache when up to date.
+
+    Parameters
+    ----------
+    version : str, optional
+        Key of :data:`VERSIONS`; the version of ``country`` by default.
+    country : str
+        Country whose version is used when ``version`` is not given.
+    cache : bool
+        Set to False to recompile from the spreadsheet.
+    """
+    if version is None:
+        version = COUNTRY_VERSIONS[country]
+    if not cache:
+        return compile_rulebook(version)
+    path = RULEBOOK_DIR / ('%s.%s.pkl' % (version, _key(version)))
+    if path.exists():
+        with open(path, 'rb') as stream:
+            return pickle.load(stream)
+    rulebook = compile_rulebook(version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + '.partial')
+    with open(partial, 'wb') as stream:
+        pickle.dump(rulebook, stream, protocol=pickle.HIGHEST_PROTOCOL)
+    partial.replace(path)
+    return rulebook
+
+
+def evaluate(df, rulebooks, household='HHID'):
+    """Electricity tiers of ``df`` under several rulebooks.
+
+    The answers are read once, and reduced to indicators once for all the
+    rulebooks sharing the same inputs and outage rules; only the tier
+    tables are applied per rulebook.  Answers the spreadsheet of a
+    rulebook does not list are left out of its indicators.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame or mtf.data.Dataset
+        Section C answers, one row per household.
+    rulebooks : list of Rulebook or str
+        Rulebooks, or versions to load.
+    household : str
+        Column identifying households.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Tier tables side by side, the columns indexed by (version,
+        attribute).
+    """
+    rulebooks = [load_rulebook(rulebook) if isinstance(rulebook, str)
+                 else rulebook for rulebook in rulebooks]
+    columns = [column for columns in ATTRIBUTE_COLUMNS.values()
+               for column in columns]
+    if household in df.columns:
+        columns.append(household)
+    data = _read(df, columns)
+    computed = {}
+    books = {}
+    for rulebook in rulebooks:
+        unused = rulebook.unused()
+        reliability = _reliability_table(rulebook.tables)
+        key = (tuple(unused), repr(reliability))
+        if key not in computed:
+            computed[key] = electricity_indicators(
+                data.assign(**{column: np.nan for column in unused}),
+                household, reliability=reliability)
+        books[rulebook.version] = rulebook.classify(computed[key])
+    return pd.concat(books, axis=1)
+
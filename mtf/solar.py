@@ -0,0 +1,83 @@
+"""Solar devices of section C (``C.csv``, questions C147 to C169).
+
+``Main_dataset.csv`` stops short of the solar device module: the power
+rating of the panels (C151) and the hours of service of the devices (C166
+during the day, C167 in the evening) are only in ``data_converted_csv/C.csv``
+(and ``Section C.dta``), one row per device and keyed by HHID.
+
+:func:`solar_sources` reduces the devices to one row per household in one
+grouped pass, already in the units of the other sources: the panels of a
+household add up, converted to monthly kWh like the capacity questions, and
+the hours of service are those of its best device.  Passed as ``solar`` to
+:func:`~mtf.electricity.electricity_indicators`, they are joined on HHID
+and enter the same source matrices as the ``Main_dataset.csv`` answers::
+
+    electricity_tiers(main_dataset(), solar=solar_sources(),
+                      households=main_households())
+
+The hours of the solar device module only stand in for the solar device
+answers of the main dataset (C172, C173) when those are blank, so that a
+device is not counted twice.  The battery capacity (C154) is not used: it
+stores what the panel produces, and its unit is not asked.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .data import converted_section
+from .model import numeric_answers
+from .profiling import instrumented
+
+#: Power rating of the solar panel (W), hours of service per day and per
+#: evening of every solar device.
+PANEL_COLUMN = 'C151'
+DAY_COLUMN = 'C166'
+EVENING_COLUMN = 'C167'
+
+#: Columns of :func:`solar_sources`, as they enter the source matrices.
+SOLAR_CAPACITY = 'Solar_Panel'
+SOLAR_DAY = 'Solar_Day'
+SOLAR_EVENING = 'Solar_Evening'
+
+#: Daily Wh per W of panel rating: the ratio of the MTF capacity
+#: thresholds in Wh/day (12, 200, 1000, ...) to those in W (3, 50, 200, ...).
+SUN_HOURS = 4
+
+
+@instrumented('cleaning')
+def solar_sources(section_c=None, household='HHID', sun_hours=SUN_HOURS):
+    """Solar panel capacity and hours of service of every household.
+
+    Parameters
+    ----------
+    section_c : pandas.DataFrame or mtf.data.Dataset, optional
+        Solar device module, one row per device, ``C.csv`` by default.
+    household : str
+        HHID column.
+    sun_hours : float
+        Daily Wh produced per W of panel rating.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by sorted HHID: ``Solar_Panel`` (monthly kWh of all the
+        panels), ``Solar_Day`` and ``Solar_Evening`` (hours of service of
+        the best device), NaN where not answered.
+    """
+    if section_c is None:
+        section_c = converted_section('C')
+    rows = section_c[[household, PANEL_COLUMN, DAY_COLUMN, EVENING_COLUMN]]
+    answers = numeric_answers(rows, [PANEL_COLUMN, DAY_COLUMN,
+                                     EVENING_COLUMN], dtype='float64')
+    answers.index = pd.Index(rows[household].to_numpy(dtype=np.int64),
+                             name=household)
+    totals = answers.groupby(level=0, sort=True).agg(
+        panels=(PANEL_COLUMN, 'sum'), rated=(PANEL_COLUMN, 'count'),
+        day=(DAY_COLUMN, 'max'), evening=(EVENING_COLUMN, 'max'))
+    # Households without any rated panel stay unanswered, not 0 W.
+    watts = totals['panels'].where(totals['rated'] > 0)
+    return pd.DataFrame({
+        SOLAR_CAPACITY: watts * sun_hours * 30 / 1000,
+        SOLAR_DAY: totals['day'],
+        SOLAR_EVENING: totals['evening'],
+    })
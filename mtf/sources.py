@@ -0,0 +1,221 @@
+"""Helpers shared by the attributes that combine several electricity sources.
+
+Most attributes (capacity, availability, ...) ask the same question once per
+electricity source: national grid, mini grid, generator set, and so on.  The
+answers are gathered in a ``(households, sources)`` float matrix, with NaN
+where a household did not answer for that source.
+
+The notebooks add the sources up, so a household with the grid and a
+generator can report more than 24 hours of supply a day.
+:func:`combine_sources` applies other policies: the primary source only or
+the best source.  The primary source of every household is resolved once,
+over all the attributes, by :func:`primary_source`.
+
+Capping the sum at 24 hours a day (or 4 hours an evening) is not one of
+them: the top tier of availability starts below the cap (23 hours a day,
+4 hours an evening), so a capped sum always lands in the same tier as the
+sum.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def source_matrix(df, columns):
+    """Return the ``columns`` of ``df`` as a 2-D float array.
+
+    Answers that are not numbers (``"Don't know"``, empty strings) become NaN.
+    """
+    columns = list(columns)
+    block = df[columns]
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+        return block.to_numpy(dtype=float, na_value=np.nan)
+    matrix = np.empty((len(block), len(columns)), dtype=float)
+    for j, column in enumerate(columns):
+        matrix[:, j] = pd.to_numeric(block[column], errors='coerce')
+    return matrix
+
+
+def sum_sources(matrix):
+    """NaN-aware row sum of a source matrix.
+
+    Households without any answer stay NaN instead of becoming 0.  Sources
+    are added from left to right, exactly like the per-row loop of the
+    notebooks, so the result is bit-for-bit the same.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    total = np.zeros(matrix.shape[0])
+    answered = np.zeros(matrix.shape[0], dtype=bool)
+    for column in matrix.T:
+        present = ~np.isnan(column)
+        total[present] += column[present]
+        answered |= present
+    total[~answered] = np.nan
+    return total
+
+
+#: Months of the paired questions, in the order of :func:`coalesce_months`
+#: scenarios.
+MONTHS = ('worst', 'typical')
+
+
+def pair_columns(pairs):
+    """Columns of the ``(worst, typical)`` ``pairs`` of
+    :func:`coalesce_months`, in order, without the months not asked."""
+    return [column for pair in pairs for column in pair if column is not None]
+
+
+def coalesce_months(answers, pairs, first='worst'):
+    """Answer of every source, from its worst and typical month questions.
+
+    Availability and reliability are asked for the worst and for the
+    typical month of the year.  The analysis uses the worst month and falls
+    back on the typical one when blank; all the pairs are coalesced at once
+    over a stacked ``(months, households, sources)`` array.
+
+    Parameters
+    ----------
+    answers : pandas.DataFrame
+        Numeric answers.
+    pairs : list of tuple
+        ``(worst, typical)`` columns of every source.  The typical month
+        may be None; further columns are fallbacks used when both months
+        are blank.
+    first : {'worst', 'typical', 'both'}
+        Month used first.  ``'both'`` coalesces the worst-first and the
+        typical-first scenarios side by side, in the same pass.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(households, sources)`` float array, NaN where no month was
+        answered; ``(2, households, sources)`` with ``'both'``, in the
+        order of :data:`MONTHS`.
+    """
+    if first not in MONTHS + ('both',):
+        raise ValueError("first must be 'worst', 'typical' or 'both', not %r"
+                         % (first,))
+    depth = max([len(MONTHS)] + [len(pair) for pair in pairs])
+    columns = list(dict.fromkeys(column for pair in pairs for column in pair
+                                 if column is not None))
+    # One array of all the columns plus a blank one, gathered into the
+    # (depth, households, sources) stack by position.
+    values = np.column_stack([
+        answers[columns].to_numpy(dtype=float, na_value=np.nan),
+        np.full(len(answers), np.nan)])
+    positions = np.full((depth, len(pairs)), len(columns), dtype=np.intp)
+    for j, pair in enumerate(pairs):
+        for k, column in enumerate(pair):
+            if column is not None:
+                positions[k, j] = columns.index(column)
+    stack = values[:, positions].transpose(1, 0, 2)
+    fallbacks = list(range(len(MONTHS), depth))
+    orders = {'worst': [0, 1] + fallbacks, 'typical': [1, 0] + fallbacks}
+    orders['both'] = [orders['worst'], orders['typical']]
+    # Levels in the order they are tried, with a leading scenario axis
+    # for 'both'.
+    levels = stack[np.asarray(orders[first])]
+    coalesced = levels[..., 0, :, :]
+    for k in range(1, depth):
+        coalesced = np.where(np.isnan(coalesced), levels[..., k, :, :],
+                             coalesced)
+    return coalesced
+
+
+#: Electricity sources, in order of precedence when two sources tie.
+SOURCES = ['National_Grid', 'Mini_Grid', 'Generator', 'Pico_Hydro',
+           'Solar_Device', 'Inverter', 'Battery']
+
+#: How the sources of a household combine into one indicator:
+#:
+#: - ``'sum'``: all the sources added up, as in the notebooks;
+#: - ``'primary'``: the primary source only (see :func:`primary_source`);
+#: - ``'max'``: the best source.
+POLICIES = ('sum', 'primary', 'max')
+
+
+def primary_source(evidence, sources=SOURCES):
+    """Primary electricity source of every household.
+
+    The primary source is the one with the largest answer in the first
+    matrix of ``evidence`` the household answered, found with a row-wise
+    argmax; ties go to the source listed first in ``sources``.
+
+    Parameters
+    ----------
+    evidence : list of (numpy.ndarray, list of str)
+        Source matrices and the source of each of their columns, in
+        decreasing order of priority (e.g. hours of supply, then capacity).
+    sources : list of str
+        All the sources.
+
+    Returns
+    -------
+    numpy.ndarray
+        int8 position of the primary source in ``sources``, -1 for
+        households without any answer.
+    """
+    primary = None
+    for matrix, names in evidence:
+        matrix = np.asarray(matrix, dtype=float)
+        if primary is None:
+            primary = np.full(len(matrix), -1, dtype=np.int8)
+        aligned = np.full((len(matrix), len(sources)), -np.inf)
+        aligned[:, [sources.index(name) for name in names]] = np.where(
+            np.isnan(matrix), -np.inf, matrix)
+        best = np.argmax(aligned, axis=1)
+        found = (primary < 0) & np.isfinite(
+            aligned[np.arange(len(aligned)), best])
+        primary[found] = best[found]
+    return primary
+
+
+def source_positions(primary, names, sources=SOURCES):
+    """Column of the primary source in a matrix of the sources ``names``.
+
+    -1 where the household has no primary source or where it is not one
+    of ``names``.
+    """
+    lookup = np.array([names.index(source) if source in names else -1
+                       for source in sources] + [-1], dtype=np.intp)
+    return lookup[np.asarray(primary, dtype=np.intp)]
+
+
+def combine_sources(matrix, policy='sum', primary=None):
+    """One value per household from a source matrix.
+
+    Parameters
+    ----------
+    matrix : numpy.ndarray
+        ``(households, sources)`` answers, NaN where not answered.
+    policy : str
+        One of :data:`POLICIES`.
+    primary : numpy.ndarray, optional
+        Column of the primary source of every household, -1 for none (see
+        :func:`source_positions`); the column with the largest answer by
+        default.
+
+    Returns
+    -------
+    numpy.ndarray
+        NaN for households without any answer.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    if policy == 'sum':
+        return sum_sources(matrix)
+    answered = ~np.isnan(matrix).all(axis=1)
+    if policy == 'max':
+        best = np.full(len(matrix), np.nan)
+        best[answered] = np.nanmax(matrix[answered], axis=1)
+        return best
+    if policy == 'primary':
+        if primary is None:
+            primary = np.where(answered, np.argmax(
+                np.where(np.isnan(matrix), -np.inf, matrix), axis=1), -1)
+        primary = np.asarray(primary, dtype=np.intp)
+        chosen = np.full(len(matrix), np.nan)
+        rows = np.flatnonzero(primary >= 0)
+        chosen[rows] = matrix[rows, primary[rows]]
+        return chosen
+    raise ValueError('policy must be one of %s, not %r'
+                     % (', '.join(POLICIES), policy))
@@ -0,0 +1,258 @@
+"""Streaming electricity tiers for files larger than memory.
+
+The tier rules only look at one household at a time, so a
+``Main_dataset.csv``-shaped file can be read in fixed-size chunks, tiered
+chunk by chunk and forgotten.  :func:`stream_tiers` yields the tier table of
+every chunk; :func:`summarise` keeps only a :class:`TierAccumulator` of
+tier counts and weights, which is all the aggregates (shares, count
+matrices, Access Index) need.  Accumulators of different files, years or
+countries merge with ``+``.
+
+The chunks are tiered by :func:`~mtf.electricity.electricity_tiers` with
+the same options as the in-memory path (solar devices, source policy,
+month used first); ``households`` plays the part of
+:func:`~mtf.data.main_households` for files without HHID column, so that
+weights and solar devices join the rows of ``Main_dataset.csv``.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .data import DTYPES, Dataset
+from .electricity import (_NO_SOLAR, ATTRIBUTE_COLUMNS, ATTRIBUTES,
+                          electricity_tiers)
+from .index import TIER_NUMBERS, index_from_counts
+from .tiers import tier_floor
+from .weights import WeightIndex, split_weights, warn_unweighted
+
+#: Households per chunk.
+CHUNKSIZE = 100000
+
+
+class TierAccumulator:
+    """Households and weight per tier of every attribute.
+
+    Parameters
+    ----------
+    counts, weights : dict, optional
+        Households and weight per tier label (a Series) of every attribute.
+    unweighted : int
+        Households counted without a weight.
+    """
+
+    def __init__(self, counts=None, weights=None, unweighted=0):
+        self._counts = dict(counts or {})
+        self._weights = dict(weights or {})
+        #: Households counted but left out of the weights, having none.
+        self.unweighted = unweighted
+
+    def __repr__(self):
+        if self.unweighted:
+            return 'TierAccumulator(%d households, %d without weight)' % (
+                self.households, self.unweighted)
+        return 'TierAccumulator(%d households)' % self.households
+
+    @property
+    def households(self):
+        """Number of households accumulated."""
+        if not self._counts:
+            return 0
+        return int(next(iter(self._counts.values())).sum())
+
+    def update(self, tiers, weights=None):
+        """Add the households of the tier table ``tiers``.
+
+        ``weights`` is the weight of every household, indexed like
+        ``tiers``, or the ``weight`` column of ``tiers``; every household
+        weighs 1 by default.  Households without a weight are counted, but
+        not weighted, and added up in :attr:`unweighted`.
+        """
+        tiers, weight = split_weights(tiers, weights)
+        if weight is None:
+            weight = np.ones(len(tiers))
+        weighted = ~np.isnan(weight)
+        self.unweighted += len(weight) - int(weighted.sum())
+        for column in tiers.columns:
+            values = pd.Categorical(tiers[column])
+            codes = values.codes
+            kept = codes >= 0
+            size = len(values.categories)
+            counts = pd.Series(np.bincount(codes[kept], minlength=size),
+                               index=values.categories)
+            kept &= weighted
+            totals = pd.Series(np.bincount(codes[kept], weights=weight[kept],
+                                           minlength=size),
+                               index=values.categories)
+            self._counts[column] = _add(self._counts.get(column), counts)
+            self._weights[column] = _add(self._weights.get(column), totals)
+        return self
+
+    def __add__(self, other):
+        merged = TierAccumulator(self._counts, self._weights,
+                                 self.unweighted + other.unweighted)
+        for column in other._counts:
+            merged._counts[column] = _add(merged._counts.get(column),
+                                          other._counts[column])
+            merged._weights[column] = _add(merged._weights.get(column),
+                                           other._weights[column])
+        return merged
+
+    def counts(self, weighted=False):
+        """Households (or weight) per tier, one column per attribute."""
+        source = self._weights if weighted else self._counts
+        table = pd.DataFrame(source).fillna(0)
+        return table if weighted else table.astype(np.int64)
+
+    def shares(self, weighted=True):
+        """Share of every tier, one column per attribute."""
+        counts = self.counts(weighted)
+        return counts / counts.sum()
+
+    def access_index(self, attributes=ATTRIBUTES, weighted=False):
+        """Access index over ``attributes``, see :mod:`mtf.index`."""
+        counts = self.counts(weighted)[list(attributes)].sum(axis=1)
+        floors = tier_floor(pd.Categorical(counts.index))
+        totals = np.zeros(len(TIER_NUMBERS))
+        np.add.at(totals, floors[floors >= 0],
+                  counts.to_numpy()[floors >= 0])
+        return float(index_from_counts(totals))
+
+
+def _add(total, counts):
+    if total is None:
+        return counts.copy()
+    return total.add(counts, fill_value=0)
+
+
+def stream_tiers(path, chunksize=CHUNKSIZE, household='HHID', tables=None,
+                 solar=None, households=None, policy='sum', month='worst'):
+    """Yield the tier table of every chunk of a section C csv.
+
+    Parameters
+    ----------
+    path : str or Path
+        csv export, one row per household, the row index in the first
+        column (like ``Main_dataset.csv``).
+    chunksize : int
+        Households per chunk.
+    household : str
+        Column identifying households; the row index is used when absent.
+    tables : dict, optional
+        Tier tables, see :func:`~mtf.electricity.electricity_tiers`.
+    solar, policy, month : optional
+        Solar devices by HHID, source policy and month used first, as for
+        :func:`~mtf.electricity.electricity_tiers`.
+    households : array-like, optional
+        HHID of every row of the file, for files without a ``household``
+        column such as ``Main_dataset.csv``
+        (:func:`~mtf.data.main_households`); sliced chunk by chunk.
+        Without it, the tier tables of such a file are indexed by row
+        number, which neither the weights nor ``solar`` can be joined on.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Tier table of the households of the chunk.
+
+    Raises
+    ------
+    ValueError
+        If ``households`` does not have one HHID per row of the file, or
+        if ``solar`` is given and no household of the file has a device.
+    """
+    header = Dataset(path).columns
+    inputs = [column for attribute in ATTRIBUTES
+              for column in ATTRIBUTE_COLUMNS[attribute]]
+    absent = [column for column in inputs if column not in header]
+    if absent:
+        warnings.warn('columns not in the dataset, treated as missing: %s'
+                      % ', '.join(absent))
+    wanted = [column for column in inputs if column in header]
+    if household in header:
+        wanted.append(household)
+    positions = [0] + [header.index(column) + 1 for column in wanted]
+    # Answers are converted chunk by chunk, so strings are enough here.
+    dtypes = {column: DTYPES.get(column, object) for column in wanted}
+    reader = pd.read_csv(path, usecols=positions, index_col=0, dtype=dtypes,
+                         chunksize=chunksize)
+    columns = inputs + ([household] if household in header else [])
+    if households is not None:
+        households = pd.Index(households)
+    start = 0
+    matched = 0
+    for chunk in reader:
+        rows = None
+        if households is not None:
+            rows = households[start:start + len(chunk)]
+            if len(rows) < len(chunk):
+                raise ValueError('households has %d HHIDs, %s has more rows'
+                                 % (len(households), path))
+        start += len(chunk)
+        devices = None
+        if solar is not None:
+            # A chunk may have no solar household; only the whole file
+            # without any is an error.
+            keys = (rows if rows is not None else chunk[household]
+                    if household in chunk.columns else chunk.index)
+            devices = solar[solar.index.isin(keys)]
+            matched += len(devices)
+        yield electricity_tiers(chunk.reindex(columns=columns), household,
+                                tables, solar=devices, households=rows,
+                                policy=policy, month=month)
+    if households is not None and start != len(households):
+        raise ValueError('households has %d HHIDs, %s has %d rows'
+                         % (len(households), path, start))
+    if solar is not None and len(solar) and start and not matched:
+        raise ValueError(_NO_SOLAR % start)
+
+
+def summarise(path, chunksize=CHUNKSIZE, weights=None, household='HHID',
+              tables=None, sink=None, solar=None, households=None,
+              policy='sum', month='worst'):
+    """Accumulate the tier counts of a csv too large to load at once.
+
+    Parameters
+    ----------
+    path : str or Path
+        csv export, see :func:`stream_tiers`.
+    chunksize : int
+        Households per chunk; memory use is bounded by its size.
+    weights : pandas.Series or mtf.weights.WeightIndex, optional
+        Weight of every household, by HHID.  Households without one are
+        counted but not weighted, with a warning.
+    household : str
+        Column identifying households.
+    tables : dict, optional
+        Tier tables.
+    sink : callable, optional
+        Called with the tier table of every chunk, e.g. to append it to a
+        file; the tables are not kept otherwise.
+    solar, households, policy, month : optional
+        See :func:`stream_tiers`.  ``households`` is needed to weigh the
+        rows of a file without HHID column::
+
+            summarise('Main_dataset.csv', weights=load_weights(),
+                      households=main_households())
+
+    Returns
+    -------
+    TierAccumulator
+
+    Raises
+    ------
+    ValueError
+        If ``weights`` are given and no household has one.
+    """
+    if isinstance(weights, WeightIndex):
+        weights = weights.as_series(household)
+    total = TierAccumulator()
+    for tiers in stream_tiers(path, chunksize, household, tables, solar,
+                              households, policy, month):
+        if sink is not None:
+            sink(tiers)
+        total.update(tiers, weights)
+    if weights is not None:
+        warn_unweighted(total.unweighted, total.households)
+    return total
@@ -0,0 +1,188 @@
+"""Survey-weighted tier distributions.
+
+The notebooks report ``value_counts()`` of every attribute, which treats
+the sample as if every household had the same weight.  Here the sampling
+weights are joined to the tier table once, on HHID, and the weighted share
+of every tier is computed for every attribute and every group in one pass:
+the groups are numbered once and each attribute is a single weighted
+``bincount`` over (group, tier) cells, however many groups there are.
+
+Neither ``A.csv`` nor ``Section A.dta`` carry the sampling strata: the
+weights are in section P (``sample_weight``, repeated on every member row)
+and the geography is read from the HHID itself, whose first digit is the
+province and first two digits the district.  Other groupings, such as
+urban/rural, can be passed as columns aligned on the households.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .profiling import instrumented
+from .tiers import MISSING
+from .weights import (SAMPLE_WEIGHT, WeightIndex, check_weights, load_weights,
+                      split_weights)
+
+#: Weight column of section P.
+WEIGHT_COLUMN = SAMPLE_WEIGHT
+
+#: Provinces of Rwanda by the first digit of the HHID.
+PROVINCES = {
+    1: 'Kigali City',
+    2: 'Southern',
+    3: 'Western',
+    4: 'Northern',
+    5: 'Eastern',
+}
+
+
+@instrumented('ingestion')
+def household_weights(section=None, household='HHID', weight=WEIGHT_COLUMN):
+    """Return the sampling weight of every household, indexed by HHID.
+
+    Parameters
+    ----------
+    section : pandas.DataFrame or mtf.data.Dataset, optional
+        Section with one or more rows per household; the cached
+        :func:`~mtf.weights.load_weights` of ``P.csv`` by default.
+    household, weight : str
+        HHID and weight columns.
+
+    Returns
+    -------
+    pandas.Series
+        float32 ``weight`` of every household, the first of its rows.
+    """
+    if section is None:
+        index = load_weights(household=household, weight=weight)
+    else:
+        index = WeightIndex.from_section(section, household, weight)
+    return index.as_series(household)
+
+
+def geography(households):
+    """Province and district of every household, read from its HHID.
+
+    Parameters
+    ----------
+    households : array-like
+        HHIDs, e.g. the index of a tier table.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``Province`` (named) and ``District`` (two-digit code) categoricals,
+        indexed like ``households``.
+    """
+    index = pd.Index(households)
+    ids = pd.to_numeric(pd.Series(index), errors='coerce').to_numpy(
+        dtype=float, na_value=np.nan)
+    digits = np.floor(np.log10(np.where(ids > 0, ids, np.nan)))
+    district = np.floor(ids / 10 ** (digits - 1))
+    province = pd.Series(np.floor(district / 10), index=index).map(PROVINCES)
+    return pd.DataFrame({
+        'Province': province.astype(
+            pd.CategoricalDtype(list(PROVINCES.values()))),
+        'District': pd.Series(district, index=index).astype('Int64').astype(
+            'category'),
+    }, index=index)
+
+
+@instrumented('aggregation')
+def weighted_shares(tiers, weights=None, by=None, attributes=None,
+                    missing=True):
+    """Weighted share of every tier, per attribute and per group.
+
+    Parameters
+    ----------
+    tiers : pandas.DataFrame
+        Categorical tier table indexed by household, e.g. the output of
+        :func:`~mtf.electricity.electricity_tiers`.
+    weights : pandas.Series, optional
+        Weight of every household, indexed by household; the ``weight``
+        column of ``tiers`` by default.  Households without a weight are
+        left out, with a warning (see :func:`~mtf.weights.check_weights`).
+        Unweighted shares when there are no weights.
+    by : str, pandas.Series, pandas.DataFrame or list, optional
+        Grouping: columns of ``tiers``, or Series/frames aligned on its
+        index (see :func:`geography`).  National shares by default.
+    attributes : list of str, optional
+        Tier columns to summarise; all categorical columns by default.
+    missing : bool
+        Whether missing households count in the shares.  With False the
+        missing category is dropped and the shares are among the assessed
+        households.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``weight`` and ``share`` of every (group..., attribute, tier) cell.
+        Shares sum to 1 within each group and attribute.
+    """
+    tiers, weight = split_weights(tiers, weights)
+    if weight is None:
+        weight = np.ones(len(tiers))
+    valid = check_weights(weight)
+    if attributes is None:
+        attributes = [column for column in tiers.columns
+                      if isinstance(tiers[column].dtype, pd.CategoricalDtype)]
+
+    keys = _group_keys(tiers, by)
+    if keys is None:
+        groups = np.zeros(len(tiers), dtype=np.intp)
+        n_groups = 1
+    else:
+        grouped = keys.groupby(list(keys.columns), observed=True, sort=True,
+                               dropna=False)
+        groups = grouped.ngroup().to_numpy()
+        labels = grouped.size().index.to_frame(index=False)
+        n_groups = len(labels)
+
+    frames = []
+    for attribute in attributes:
+        column = tiers[attribute]
+        categories = list(column.cat.categories)
+        codes = column.cat.codes.to_numpy()
+        counted = valid & (codes >= 0)
+        if not missing and categories[-1:] == [MISSING]:
+            counted &= codes != len(categories) - 1
+            categories = categories[:-1]
+        cells = groups[counted] * len(categories) + codes[counted]
+        totals = np.bincount(cells, weights=weight[counted],
+                             minlength=n_groups * len(categories))
+        totals = totals.reshape(n_groups, len(categories))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            shares = totals / totals.sum(axis=1, keepdims=True)
+        frames.append(pd.DataFrame({
+            'attribute': attribute,
+            'tier': np.tile(categories, n_groups),
+            'weight': totals.ravel(),
+            'share': shares.ravel(),
+            '_group': np.repeat(np.arange(n_groups), len(categories)),
+        }))
+
+    long = pd.concat(frames, ignore_index=True)
+    if keys is not None:
+        group_keys = labels.iloc[long.pop('_group')]
+        long = pd.concat([group_keys.reset_index(drop=True), long], axis=1)
+    else:
+        long = long.drop(columns='_group')
+    return long.set_index([column for column in long.columns
+                           if column not in ('weight', 'share')])
+
+
+def _group_keys(tiers, by):
+    """Grouping columns aligned on the households of ``tiers``."""
+    if by is None:
+        return None
+    if not isinstance(by, list):
+        by = [by]
+    keys = []
+    for key in by:
+        if isinstance(key, str):
+            keys.append(tiers[key])
+        elif isinstance(key, pd.DataFrame):
+            keys.extend(key.reindex(tiers.index)[column]
+                        for column in key.columns)
+        else:
+            keys.append(key.reindex(tiers.index))
+    return pd.concat(keys, axis=1)
@@ -0,0 +1,292 @@
+"""Threshold tables mapping a numeric indicator onto MTF tiers.
+
+Every continuous attribute is a set of half-open bins: ``labels[0]`` for
+values below ``edges[0]``, ``labels[i]`` for ``edges[i-1] <= x < edges[i]``
+and ``labels[-1]`` from ``edges[-1]`` upwards.  Bins are located with a
+binary search over a float array instead of an if/elif chain per element.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+#: Label used for households that did not answer the question.
+MISSING = 'Missing_data'
+
+
+def as_float(values):
+    """Return ``values`` as a float array, non-numeric entries becoming NaN."""
+    if isinstance(values, (pd.Series, pd.Index)):
+        if not pd.api.types.is_numeric_dtype(values.dtype):
+            values = pd.to_numeric(values, errors='coerce')
+        return values.to_numpy(dtype=float, na_value=np.nan)
+    values = np.asarray(values)
+    if values.dtype.kind not in 'biuf':
+        values = pd.to_numeric(pd.Series(values.ravel()), errors='coerce')
+        return values.to_numpy(dtype=float, na_value=np.nan)
+    return values.astype(float, copy=False)
+
+
+def _lowest(label):
+    """Lowest tier covered by ``label`` ('3&4' gives 3), None if not a tier."""
+    match = re.search(r'\d', str(label))
+    return int(match.group()) if match else None
+
+
+def _ordered(labels, missing):
+    """Distinct ``labels`` from the lowest tier up, ``missing`` last."""
+    labels = [label for label in dict.fromkeys(labels) if label != missing]
+    ranked = [label for label in labels if _lowest(label) is not None]
+    return (sorted(ranked, key=_lowest)
+            + [label for label in labels if _lowest(label) is None]
+            + [missing])
+
+
+class _Table:
+    """Shared behaviour of the tier tables: codes to categorical tiers."""
+
+    def codes(self, values):
+        raise NotImplementedError
+
+    def classify(self, values):
+        """Return the tier of every value as a categorical.
+
+        A Series comes back as a categorical Series with the same index.
+        """
+        tiers = pd.Categorical.from_codes(self.codes(values),
+                                          categories=self.categories)
+        if isinstance(values, pd.Series):
+            return pd.Series(tiers, index=values.index, name=values.name)
+        return tiers
+
+
+class TierTable(_Table):
+    """Declarative bin table for one attribute.
+
+    Parameters
+    ----------
+    edges : sequence of float
+        Sorted lower bounds of every bin but the first.
+    labels : sequence of str
+        Tier label of each bin, ``len(edges) + 1`` of them.  Labels may
+        repeat when several bins share a tier.
+    missing : str
+        Label given to NaN (and to ``missing_values``).
+    missing_values : sequence of float
+        Answers that must be reported as missing, e.g. 0 hours of evening
+        supply in the Rwanda analysis.
+    """
+
+    def __init__(self, edges, labels, missing=MISSING, missing_values=()):
+        self.edges = np.asarray(edges, dtype=float)
+        self.labels = tuple(labels)
+        self.missing = missing
+        self.missing_values = tuple(missing_values)
+        if len(self.labels) != len(self.edges) + 1:
+            raise ValueError('a table with %d edges needs %d labels, got %d'
+                             % (len(self.edges), len(self.edges) + 1,
+                                len(self.labels)))
+        if np.any(np.diff(self.edges) < 0):
+            raise ValueError('edges must be sorted in increasing order')
+        self.categories = _ordered(self.labels, missing)
+        self._codes = np.array([self.categories.index(label)
+                                for label in self.labels], dtype=np.int8)
+        self._missing_code = self.categories.index(missing)
+
+    def __repr__(self):
+        return 'TierTable(edges=%s, labels=%s)' % (list(self.edges),
+                                                   list(self.labels))
+
+    def codes(self, values):
+        """Return the category code of every value as an int8 array."""
+        values = as_float(values)
+        codes = self._codes[np.searchsorted(self.edges, values, side='right')]
+        missing = np.isnan(values)
+        for value in self.missing_values:
+            missing |= values == value
+        codes[missing] = self._missing_code
+        return codes
+
+
+class CodeTable(_Table):
+    """Tier table for coded answers (Yes/No, bill type, fuel, ...).
+
+    Parameters
+    ----------
+    labels : dict
+        Maps a tier label to the answers that get it.
+    default : str
+        Label of every other answer.
+    missing : str
+        Label given to blank answers and to ``missing_values``.
+    missing_values : sequence
+        Answers that must be reported as missing, e.g. "Don't know".
+    """
+
+    def __init__(self, labels, default, missing=MISSING, missing_values=()):
+        self.labels = {label: list(answers)
+                       for label, answers in labels.items()}
+        self.default = default
+        self.missing = missing
+        self.missing_values = list(missing_values)
+        self.categories = _ordered(list(self.labels) + [default], missing)
+
+    def __repr__(self):
+        return 'CodeTable(%r, default=%r)' % (self.labels, self.default)
+
+    def codes(self, values):
+        """Return the category code of every answer as an int8 array."""
+        # Tier the distinct answers only, then broadcast with their codes.
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        uniques = pd.Series(uniques, dtype=object)
+        lookup = np.full(len(uniques) + 1, self.categories.index(self.default),
+                         dtype=np.int8)
+        for label, answers in self.labels.items():
+            lookup[:-1][uniques.isin(answers).to_numpy()] = \
+                self.categories.index(label)
+        if self.missing_values:
+            lookup[:-1][uniques.isin(self.missing_values).to_numpy()] = \
+                self.categories.index(self.missing)
+        lookup[-1] = self.categories.index(self.missing)
+        return lookup[codes]
+
+
+class OutageTable:
+    """Tier table of outages: their number per week and their duration.
+
+    Parameters
+    ----------
+    rules : list of (label, frequency, duration)
+        Tried in order, the first rule matching a value wins.
+        ``frequency`` is the ``(low, high]`` range of outages per week and
+        ``duration`` the open ``(low, high)`` range of hours of outage, or
+        None when the rule ignores the duration.  A bound of None is open.
+    default : str
+        Label of the outages no rule matches.
+    missing : str
+        Label given to a blank frequency, or to a blank duration when a
+        rule looks at it.
+    """
+
+    def __init__(self, rules, default, missing=MISSING):
+        self.rules = [(label, tuple(frequency),
+                       None if duration is None else tuple(duration))
+                      for label, frequency, duration in rules]
+        self.default = default
+        self.missing = missing
+        self.categories = _ordered([label for label, _, _ in self.rules]
+                                   + [default], missing)
+        #: Whether the duration is needed to tier the outages.
+        self.duration = any(duration is not None
+                            for _, _, duration in self.rules)
+
+    def __repr__(self):
+        return 'OutageTable(%r, default=%r)' % (self.rules, self.default)
+
+    def codes(self, frequency, duration=None):
+        """Return the category code of every value as an int8 array."""
+        frequency = np.asarray(frequency, dtype=float)
+        codes = np.full(frequency.shape, self.categories.index(self.default),
+                        dtype=np.int8)
+        missing = np.isnan(frequency)
+        if self.duration:
+            duration = np.asarray(duration, dtype=float)
+            missing |= np.isnan(duration)
+        matched = np.zeros(frequency.shape, dtype=bool)
+        # NaN fails every comparison, so blank answers match no rule.
+        for label, (low, high), hours in self.rules:
+            rule = ~matched
+            if low is not None:
+                rule &= frequency > low
+            if high is not None:
+                rule &= frequency <= high
+            if hours is not None:
+                if hours[0] is not None:
+                    rule &= duration > hours[0]
+                if hours[1] is not None:
+                    rule &= duration < hours[1]
+            codes[rule] = self.categories.index(label)
+            matched |= rule
+        codes[missing] = self.categories.index(self.missing)
+        return codes
+
+    def classify(self, frequency, duration=None):
+        """Return the tier of every (frequency, duration) as a categorical.
+        """
+        return pd.Categorical.from_codes(self.codes(frequency, duration),
+                                         categories=self.categories)
+
+
+def classify(values, table):
+    """Shortcut for ``table.classify(values)``."""
+    return table.classify(values)
+
+
+def _highest(label):
+    """Highest tier covered by ``label`` ('3&4' gives 4), None if not a tier.
+    """
+    digits = re.findall(r'\d', str(label))
+    return int(digits[-1]) if digits else None
+
+
+def tier_range(tiers, missing=MISSING):
+    """Return the (lower, upper) tier of each label as two int8 arrays.
+
+    ``'3&4'`` is the range (3, 4), ``'0,1,2&3'`` (0, 3) and a plain tier
+    ``'2'`` (2, 2); missing labels are (-1, -1).  Labels are parsed once
+    per category, so the cost is one lookup per household.
+    """
+    tiers = pd.Categorical(tiers)
+    bounds = np.array(
+        [(-1, -1) if label == missing or _lowest(label) is None
+         else (_lowest(label), _highest(label))
+         for label in tiers.categories] + [(-1, -1)],
+        dtype=np.int8).reshape(-1, 2)
+    # The trailing (-1, -1) is picked up by the code of NaN entries.
+    lower, upper = bounds[tiers.codes].T
+    return lower, upper
+
+
+def tier_floor(tiers, missing=MISSING):
+    """Return the lowest tier covered by each label as an int8 array.
+
+    ``'1&2'`` gives 1, ``'0,1,2&3'`` gives 0 and missing labels give -1.
+    """
+    return tier_range(tiers, missing)[0]
+
+
+def tier_ceiling(tiers, missing=MISSING):
+    """Return the highest tier covered by each label, -1 when missing."""
+    return tier_range(tiers, missing)[1]
+
+
+def tier_midpoint(tiers, missing=MISSING):
+    """Return the middle of the range of each label, NaN when missing."""
+    lower, upper = tier_range(tiers, missing)
+    middle = (lower + upper.astype(float)) / 2
+    middle[lower < 0] = np.nan
+    return middle
+
+
+#: Plain tiers 0 to 5, for indicators that are already a tier number.
+TIERS = TierTable([1, 2, 3, 4, 5], ['0', '1', '2', '3', '4', '5'])
+
+#: Capacity in Wh/day.
+CAPACITY_TIERS = TierTable([12, 200, 1000, 3400, 8200],
+                           ['0', '1', '2', '3', '4', '5'])
+
+#: Hours of supply per day; tiers 1 and 2 share the same threshold.
+DAY_AVAILABILITY_TIERS = TierTable([4, 8, 16, 23],
+                                   ['0', '1&2', '3', '4', '5'])
+
+#: Hours of supply per evening; tiers 4 and 5 share the same threshold.
+#: No supply at all is reported as missing in the Rwanda analysis, and
+#: negative answers fall through to the top bin like in the notebook.
+EVENING_AVAILABILITY_TIERS = TierTable([0, 1, 2, 3, 4],
+                                       ['4&5', '0', '1', '2', '3', '4&5'],
+                                       missing_values=[0])
+
+#: Minutes spent preparing the primary cookstove for each meal.
+COOKING_CONVENIENCE_TIERS = TierTable([2, 5, 10, 15],
+                                      ['5', '4', '3', '2', '0&1'])
@@ -0,0 +1,212 @@
+"""Sampling weights carried next to the tiers.
+
+``P.csv`` repeats the ``sample_weight`` of a household on every member row.
+:class:`WeightIndex` keeps one weight per household: sorted int64 HHIDs and
+float32 weights, so that resolving the weights of a tier table is a binary
+search rather than a pandas join.  The index is built once per ``P.csv``
+and cached as ``.npz`` under the size and modification time of the file;
+:func:`~mtf.survey.household_weights` reads the same cache.
+
+:func:`attach_weights` stores the weights as a float32 ``weight`` column of
+the tier table; the counts, figures, count matrices and Access Index pick
+that column up and count every household by its weight with the same
+``bincount`` as the unweighted counts.  A household without a weight is
+never counted as weighing 0 silently: :func:`check_weights` warns with the
+number left out, and raises when no household of the table has a weight
+(typically a table indexed by row number rather than HHID).
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .data import CONVERTED_SECTIONS, Dataset, cache_path
+
+#: Column of the tier table holding the weight of every household.
+WEIGHT = 'weight'
+
+#: Weight column of section P.
+SAMPLE_WEIGHT = 'sample_weight'
+
+
+class WeightIndex:
+    """Sampling weight of every household, searchable by HHID.
+
+    Parameters
+    ----------
+    households : array-like of int
+        HHIDs, unique.
+    weights : array-like of float
+        Weight of every household.
+    """
+
+    def __init__(self, households, weights):
+        households = np.asarray(households, dtype=np.int64)
+        order = np.argsort(households, kind='stable')
+        self.households = households[order]
+        self.weights = np.asarray(weights, dtype=np.float32)[order]
+
+    def __repr__(self):
+        return 'WeightIndex(%d households)' % len(self)
+
+    def __len__(self):
+        return len(self.households)
+
+    @classmethod
+    def from_section(cls, section, household='HHID', weight=SAMPLE_WEIGHT):
+        """Index of a section with one or more rows per household.
+
+        The first weight of every household is kept.
+        """
+        rows = section[[household, weight]]
+        households = rows[household].to_numpy(dtype=np.int64)
+        keys, first = np.unique(households, return_index=True)
+        return cls(keys, rows[weight].to_numpy(dtype=float)[first])
+
+    def as_series(self, household='HHID'):
+        """Weights as a float32 Series named ``weight``, indexed by HHID."""
+        return pd.Series(self.weights,
+                         index=pd.Index(self.households, name=household),
+                         name=WEIGHT)
+
+    def lookup(self, households):
+        """Weights of ``households`` as float32, NaN for unknown HHIDs."""
+        households = pd.to_numeric(pd.Series(np.asarray(households)),
+                                   errors='coerce').to_numpy(dtype=float)
+        weights = np.full(len(households), np.nan, dtype=np.float32)
+        if not len(self):
+            return weights
+        rows = np.flatnonzero(~np.isnan(households))
+        keys = households[rows].astype(np.int64)
+        positions = np.searchsorted(self.households, keys)
+        positions[positions == len(self)] = 0
+        found = self.households[positions] == keys
+        weights[rows[found]] = self.weights[positions[found]]
+        return weights
+
+
+def load_weights(path=None, cache=True, household='HHID',
+                 weight=SAMPLE_WEIGHT):
+    """Return the :class:`WeightIndex` of ``P.csv``, cached as ``.npz``.
+
+    Parameters
+    ----------
+    path : str or Path, optional
+        Section with one or more rows per household, ``P.csv`` by default.
+    cache : bool
+        Set to False to bypass the cache.
+    household, weight : str
+        HHID and weight columns.
+    """
+    path = CONVERTED_SECTIONS['P'] if path is None else path
+    dataset = Dataset(path)
+    if not cache:
+        return WeightIndex.from_section(dataset, household, weight)
+    target = cache_path(path, 'weights.npz', household=household,
+                        weight=weight)
+    if target.exists():
+        with np.load(target) as stored:
+            return WeightIndex(stored['households'], stored['weights'])
+    index = WeightIndex.from_section(dataset, household, weight)
+    target.parent.mkdir(exist_ok=True)
+    partial = target.with_name(target.name + '.partial.npz')
+    np.savez(partial, households=index.households, weights=index.weights)
+    partial.replace(target)
+    return index
+
+
+def attach_weights(tiers, weights, households=None):
+    """Return ``tiers`` with the float32 ``weight`` of every household.
+
+    Parameters
+    ----------
+    tiers : pandas.DataFrame
+        Tier table.
+    weights : WeightIndex or pandas.Series
+        Weights by HHID.
+    households : array-like, optional
+        HHID of every row of ``tiers``; its index by default.
+
+    Raises
+    ------
+    ValueError
+        If no household of ``tiers`` has a weight.
+    """
+    households = tiers.index if households is None else households
+    if isinstance(weights, WeightIndex):
+        values = weights.lookup(households)
+    else:
+        values = weights.reindex(households).to_numpy(dtype=np.float32,
+                                                      na_value=np.nan)
+    if len(values) and np.isnan(values).all():
+        raise ValueError(_NO_WEIGHT % len(values))
+    return tiers.assign(**{WEIGHT: values})
+
+
+_NO_WEIGHT = ('none of the %d households has a weight; are they indexed by '
+              'HHID? Main_dataset.csv rows are numbered, see '
+              'mtf.data.main_households')
+
+
+def check_weights(weights):
+    """Return which households have a weight.
+
+    Warns with the number of households without a weight, which the
+    weighted counts leave out.
+
+    Raises
+    ------
+    ValueError
+        If there are households and none has a weight.
+    """
+    weights = np.asarray(weights, dtype=float)
+    weighted = ~np.isnan(weights)
+    warn_unweighted(len(weights) - int(weighted.sum()), len(weights))
+    return weighted
+
+
+def warn_unweighted(unweighted, households):
+    """Report ``unweighted`` households without a weight out of
+    ``households``: a warning, or ValueError if none has a weight.
+    """
+    if households and unweighted == households:
+        raise ValueError(_NO_WEIGHT % households)
+    if unweighted:
+        warnings.warn('%d of %d households have no weight and are left out '
+                      'of the weighted counts' % (unweighted, households))
+
+
+def split_weights(tiers, weights=None):
+    """Separate the tier columns from the household weights.
+
+    Returns the tier table without the ``weight`` column and the weights
+    as a float array: ``weights`` (a Series aligned on the households)
+    when given, else the ``weight`` column, else None.
+    """
+    if isinstance(tiers, pd.DataFrame) and WEIGHT in tiers.columns:
+        if weights is None:
+            weights = tiers[WEIGHT]
+        tiers = tiers.drop(columns=WEIGHT)
+    if weights is None:
+        return tiers, None
+    if isinstance(weights, pd.Series):
+        weights = weights.reindex(tiers.index)
+    return tiers, np.asarray(weights, dtype=float)
+
+
+def tier_counts(tiers, weights=None):
+    """Households per tier label, or their total weight.
+
+    Households without a weight are left out of the weighted counts, see
+    :func:`check_weights`.
+    """
+    tiers = pd.Categorical(tiers)
+    kept = tiers.codes >= 0
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        kept &= check_weights(weights)
+        weights = weights[kept]
+    counts = np.bincount(tiers.codes[kept], weights=weights,
+                         minlength=len(tiers.categories))
+    return pd.Series(counts, index=tiers.categories)
@@ -0,0 +1,34 @@
+"""Capacity tier from the appliances of section L."""
+
+from pathlib import Path
+
+import pandas as pd
+
+from mtf.appliances import (appliance_inventory, appliance_tiers,
+                            read_appliance_tiers)
+
+SECTION_L = Path(__file__).parent / 'data' / 'section_l.csv'
+
+#: Households 1 to 4, the last one without any appliance.
+HOUSEHOLDS = pd.Series([1, 2, 3, 4])
+
+
+def test_appliance_tier_lookup():
+    lookup = read_appliance_tiers()
+    # LED bulb, radio, refrigerator, charcoal iron, electric stove.
+    assert list(lookup[[36, 39, 43, 47, 61]]) == [2, 1, 3, 0, 5]
+    assert lookup[0] == -1
+
+
+def test_highest_tier_of_owned_appliances():
+    tiers = appliance_tiers(HOUSEHOLDS, pd.read_csv(SECTION_L))
+    # The refrigerator of household 2 is not owned (La is 0) and item 999
+    # of household 3 is not an appliance.
+    assert list(tiers) == ['3', '1', '0', '0']
+    assert tiers.name == 'Appliance_Capacity'
+
+
+def test_inventory_lists_owned_items():
+    inventory = appliance_inventory(HOUSEHOLDS, pd.read_csv(SECTION_L))
+    assert list(inventory['items']) == [[36, 43], [39], [47, 999], []]
+    assert list(inventory['amount']) == [[3, 1], [1], [1, 2], []]
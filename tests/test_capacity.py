@@ -0,0 +1,120 @@
+"""Capacity and availability: the sum over the electricity sources."""
+
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.capacity import CAPACITY_COLUMNS
+from mtf.data import main_dataset
+from mtf.electricity import (DAY_AVAILABILITY_COLUMNS, electricity_indicators,
+                             electricity_tiers)
+
+FIXTURE = Path(__file__).parent / 'data' / 'capacity.csv'
+
+
+def notebook_sum(df_total):
+    """The ``.iat`` loop of the electricity notebook, blank rows stay NaN."""
+    lst = []
+    for i in range(df_total.shape[0]):
+        add = 0
+        gotnum = False
+        for j in range(df_total.shape[1]):
+            if math.isnan(df_total.iat[i, j]) == False:  # noqa: E712
+                gotnum = True
+                add = add + df_total.iat[i, j]
+        if gotnum:
+            lst.append(add)
+        else:
+            lst.append(math.nan)
+    return pd.Series(lst, index=df_total.index)
+
+
+def notebook_capacity(df):
+    """Capacity cells of the notebook: kWh a month to Wh a day."""
+    total = notebook_sum(df[list(CAPACITY_COLUMNS)]).replace(0, np.nan)
+    return total.apply(lambda x: x if math.isnan(x) else (x * 1000) / 30)
+
+
+def notebook_availability(df):
+    """Availability cells of the notebook: worst month, else typical."""
+    df_av = pd.DataFrame({
+        worst: df[worst] if typical is None else df[worst].fillna(df[typical])
+        for worst, typical in DAY_AVAILABILITY_COLUMNS})
+    df_av = df_av.replace(to_replace="Don't know", value=0)
+    return notebook_sum(df_av.apply(pd.to_numeric, errors='coerce'))
+
+
+def capacity_conditions(Total_Capacity):
+    if math.isnan(Total_Capacity):
+        return 'Missing_data'
+    elif Total_Capacity < 12:
+        return '0'
+    elif 12 <= Total_Capacity < 200:
+        return '1'
+    elif 200 <= Total_Capacity < 1000:
+        return '2'
+    elif 1000 <= Total_Capacity < 3400:
+        return '3'
+    elif 3400 <= Total_Capacity < 8200:
+        return '4'
+    else:
+        return '5'
+
+
+def availability_conditions(Total_availability):
+    if math.isnan(Total_availability):
+        return 'Missing_data'
+    elif Total_availability < 4:
+        return '0'
+    elif 4 <= Total_availability < 8:
+        return '1&2'
+    elif 8 <= Total_availability < 16:
+        return '3'
+    elif 16 <= Total_availability < 23:
+        return '4'
+    else:
+        return '5'
+
+
+@pytest.fixture
+def notebook():
+    # The 888 code is read as missing, like the reliability cell of the
+    # notebook does; "Don't know" hours are replaced with 0.
+    return pd.read_csv(FIXTURE, index_col=0, na_values=[888])
+
+
+@pytest.fixture
+def indicators():
+    with pytest.warns(UserWarning, match='columns not in the dataset'):
+        return electricity_indicators(main_dataset(FIXTURE))
+
+
+def test_capacity_is_the_notebook_sum(indicators):
+    # 888 kWh is a reading, not a code: the capacity columns keep it.
+    expected = notebook_capacity(pd.read_csv(FIXTURE, index_col=0))
+    np.testing.assert_array_equal(indicators['Capacity'], expected)
+    # Sources are added left to right: 0.1 + 0.2 + 0.3 != 0.6.
+    assert indicators.loc[0, 'Capacity'] == (0.1 + 0.2 + 0.3) * 1000 / 30
+    assert math.isnan(indicators.loc[2, 'Capacity'])
+
+
+def test_availability_is_the_notebook_sum(notebook, indicators):
+    expected = notebook_availability(notebook)
+    np.testing.assert_array_equal(indicators['Availability'], expected)
+    # "Don't know" is 0 hours and is not replaced by the typical month.
+    assert indicators.loc[0, 'Availability'] == 0 + 0.1 + 0.2 + 0.3 + 3.4
+    assert indicators.loc[2, 'Availability'] == 5 + 4
+
+
+@pytest.mark.filterwarnings('ignore:columns not in the dataset')
+def test_tiers_match_notebook_conditions(notebook):
+    tiers = electricity_tiers(main_dataset(FIXTURE))
+    capacity = notebook_capacity(pd.read_csv(FIXTURE, index_col=0))
+    assert list(tiers['Capacity']) == [capacity_conditions(value)
+                                       for value in capacity]
+    assert list(tiers['Availability']) == [
+        availability_conditions(value)
+        for value in notebook_availability(notebook)]
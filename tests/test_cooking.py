@@ -0,0 +1,55 @@
+"""Primary stoves of section I and the cooking tiers."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mtf.cooking import (COOKING_ATTRIBUTES, HOUSEHOLD_COLUMN, PLACE_COLUMN,
+                         StoveLinkage, cooking_tiers)
+from mtf.tiers import MISSING
+
+SECTION_I = Path(__file__).parent / 'data' / 'section_i.csv'
+
+#: Households 1 to 4, the last one without any stove.
+HOUSEHOLDS = pd.Series([1, 2, 3, 4])
+
+
+def test_fuel_counts_by_household_weight():
+    linkage = StoveLinkage(HOUSEHOLDS, pd.read_csv(SECTION_I))
+    counts = linkage.fuel_counts(fuels=[4, 5, 15])
+    # Only primary stoves (I3 == 1) of listed households count.
+    assert counts.to_dict() == {4: 0, 5: 1, 15: 1}
+    weighted = linkage.fuel_counts(fuels=[4, 5, 15],
+                                   weights=[1.5, 2.0, 3.0, 4.0])
+    assert weighted.to_dict() == {4: 0, 5: 2.0, 15: 1.5}
+
+
+def test_primary_fuel_of_every_household():
+    linkage = StoveLinkage(HOUSEHOLDS, pd.read_csv(SECTION_I),
+                           answers=['I21'])
+    # The wood stove of household 1 is not its primary stove; household 3
+    # left its fuel blank and household 4 has no stove.
+    np.testing.assert_array_equal(linkage.primary_fuel, [15, 5, np.nan,
+                                                         np.nan])
+    assert linkage.fuels == [[15], [5], [], []]
+    assert linkage.stoves == [[3], [1], [2], []]
+    np.testing.assert_array_equal(linkage.primary_answer('I21'),
+                                  [1, 12, np.nan, np.nan])
+
+
+def test_blank_answers_are_missing():
+    main = pd.DataFrame({
+        HOUSEHOLD_COLUMN: HOUSEHOLDS,
+        PLACE_COLUMN: [5, 1, 5, 5],
+        'I16_How many doors and windows': [np.nan, 2, 1, 1],
+    })
+    tiers = cooking_tiers(main, pd.read_csv(SECTION_I))
+    assert list(tiers.columns) == COOKING_ATTRIBUTES
+    # Household 1 is tiered without its number of windows (I16).
+    assert list(tiers.loc[0]) == ['5', '5', '4&5', '5']
+    assert list(tiers.loc[1]) == ['0-3', '2', '0-3', '4']
+    # The primary stove of household 3 has blank fuel (I18A), time and
+    # fuel availability (I19A) answers, and no injury reported.
+    assert list(tiers.loc[2]) == [MISSING, MISSING, '4&5', MISSING]
+    assert list(tiers.loc[3]) == [MISSING] * 4
@@ -0,0 +1,35 @@
+"""Country profiles: renamed variables, "don't know" and missing data."""
+
+import pandas as pd
+import pytest
+
+from mtf.countries import (ETHIOPIA_COLUMNS, PROFILES, CountryProfile,
+                           country_tiers)
+
+
+def test_missing_profile_raises(tmp_path):
+    profile = CountryProfile('Nowhere', tmp_path / 'Section C.dta')
+    with pytest.raises(FileNotFoundError, match='Nowhere'):
+        country_tiers([profile])
+
+
+def test_missing_default_profile_warns():
+    if PROFILES['Ethiopia'].available():
+        pytest.skip('Ethiopia section C is on disk')
+    with pytest.warns(UserWarning, match='Ethiopia'):
+        tables = country_tiers(processes=1)
+    assert 'Ethiopia' not in tables
+
+
+@pytest.mark.filterwarnings('ignore:columns not in the dataset')
+def test_dont_know_is_missing(tmp_path):
+    path = tmp_path / 'ethiopia.csv'
+    pd.DataFrame({'HHID': [1, 2, 3],
+                  'C17': ['no bill for electricity', "don't know",
+                          'yes']}).to_csv(path)
+    ethiopia = PROFILES['Ethiopia']
+    profile = CountryProfile('Ethiopia', path, columns=ETHIOPIA_COLUMNS,
+                             rulebook='ethiopia',
+                             dont_know=ethiopia.dont_know)
+    formality = profile.tiers()['Formality']
+    assert list(formality) == ['0,1,2&3', 'Missing_data', '4&5']
@@ -0,0 +1,52 @@
+"""Access Index, its bounds and its bootstrap interval."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.index import (access_index, access_index_bounds,
+                       bootstrap_access_index)
+from mtf.weights import WEIGHT
+
+TIERS = pd.DataFrame({
+    'Availability': ['5', '3', '0', '1&2'],
+    'Reliability': ['3&4', '5', 'Missing_data', '0,1&2'],
+})
+
+WEIGHTS = [1, 2, 3, 4]
+
+
+def test_bounds_of_composite_labels():
+    # Lowest tiers 5 + 3 + 0 + 1 and 3 + 5 + 0, highest 5 + 3 + 0 + 2
+    # and 4 + 5 + 2, over 7 assessed attributes.
+    low, high = access_index_bounds(TIERS)
+    assert low == pytest.approx(20 * 17 / 7)
+    assert high == pytest.approx(20 * 21 / 7)
+    assert access_index(TIERS) == low
+
+
+def test_weighted_bounds():
+    low, high = access_index_bounds(TIERS, weights=WEIGHTS)
+    assert low == pytest.approx(20 * (8 * 1 + 8 * 2 + 0 + 1 * 4) / 17)
+    assert high == pytest.approx(20 * (9 * 1 + 8 * 2 + 0 + 4 * 4) / 17)
+    assert access_index(TIERS.assign(**{WEIGHT: WEIGHTS})) == low
+
+
+@pytest.mark.parametrize('weights', [None, WEIGHTS])
+def test_bootstrap_interval_contains_the_index(weights):
+    result = bootstrap_access_index(TIERS, replicates=500, seed=1,
+                                    batch=128, weights=weights)
+    assert result.index == pytest.approx(
+        access_index(TIERS, weights=weights))
+    assert result.low <= result.index <= result.high
+    assert len(result.replicates) == 500
+
+
+def test_bootstrap_seed_is_reproducible():
+    tiers = TIERS.sample(200, replace=True, random_state=0)
+    first = bootstrap_access_index(tiers, replicates=300, seed=7)
+    again = bootstrap_access_index(tiers, replicates=300, seed=7)
+    np.testing.assert_array_equal(first.replicates, again.replicates)
+    assert (first.low, first.high) == (again.low, again.high)
+    other = bootstrap_access_index(tiers, replicates=300, seed=8)
+    assert not np.array_equal(first.replicates, other.replicates)
@@ -0,0 +1,35 @@
+"""Attribute by tier count matrices."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.matrix import tier_matrix
+
+TIERS = pd.DataFrame({
+    'Capacity': pd.Categorical(['0', '3&4', '5', 'Missing_data']),
+    'Quality': pd.Categorical(['4&5', '4&5', '0,1,2&3', '4&5']),
+})
+
+
+def test_raw_and_collapsed_counts():
+    matrices = tier_matrix(TIERS, missing=True)
+    assert matrices['raw'].loc['Capacity', '3&4'] == 1
+    assert matrices['raw'].loc['Capacity', 'Missing_data'] == 1
+    # Composite labels add up into their lowest tier.
+    assert matrices['collapsed'].loc['Quality', '4'] == 3
+    assert matrices['collapsed'].loc['Quality', '0'] == 1
+
+
+def test_unweighted_households_warn():
+    weights = pd.Series([1.0, 2.0, np.nan, 4.0])
+    with pytest.warns(UserWarning, match='1 of 4 households have no weight'):
+        matrices = tier_matrix(TIERS, weights=weights)
+    assert matrices['weighted'].loc['Quality', '4&5'] == 7
+    assert matrices['weighted'].loc['Capacity', '5'] == 0
+    assert matrices['raw'].loc['Capacity', '5'] == 1
+
+
+def test_no_weight_raises():
+    with pytest.raises(ValueError, match='none of the 4 households'):
+        tier_matrix(TIERS, weights=pd.Series([np.nan] * 4))
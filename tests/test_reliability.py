@@ -0,0 +1,100 @@
+"""Reliability of the national and mini grid (C29/C30, C71/C72)."""
+
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.data import main_dataset
+from mtf.electricity import (RELIABILITY_COLUMNS, electricity_tiers,
+                             household_reliability, reliability_by_source)
+from mtf.model import numeric_answers
+from mtf.rulebook import compile_rulebook, evaluate
+
+FIXTURE = Path(__file__).parent / 'data' / 'reliability.csv'
+
+OUTAGE_COLUMNS = ['C29A', 'C29B', 'C30A', 'C30B',
+                  'C71A', 'C71B', 'C72A', 'C72B']
+
+
+def notebook_reliability(frequency, duration):
+    """The row loop of the reliability cell of the electricity notebook."""
+    if math.isnan(frequency) or math.isnan(duration):
+        return 'Missing_data'
+    if 0 < frequency <= 3 and duration < 2:
+        return '5'
+    if 3 < frequency <= 14 and duration > 2:
+        return '3&4'
+    return '0,1&2'
+
+
+def frequency_reliability(frequency):
+    """The reliability cell of MTF-Electricity.ipynb: outages per week."""
+    if math.isnan(frequency) or frequency == 0:
+        return '0'
+    if frequency <= 3:
+        return '5'
+    if frequency <= 14:
+        return '3'
+    return '0'
+
+
+@pytest.fixture
+def outages():
+    return numeric_answers(pd.read_csv(FIXTURE, index_col=0), OUTAGE_COLUMNS,
+                           dtype='float64')
+
+
+@pytest.mark.filterwarnings('ignore:columns not in the dataset')
+def test_household_tiers_use_both_grids():
+    tiers = electricity_tiers(main_dataset(FIXTURE))
+    expected = pd.read_csv(FIXTURE, index_col=0, dtype={'expected': str})
+    assert list(tiers['Reliability']) == list(expected['expected'])
+
+
+def test_mini_grid_only_when_national_grid_missing(outages):
+    by_source = reliability_by_source(outages)
+    assert list(by_source.columns) == list(RELIABILITY_COLUMNS)
+    assert by_source.loc[3, 'National_Grid'] == 'Missing_data'
+    assert by_source.loc[3, 'Mini_Grid'] == '5'
+    # Both grids assessed: the national grid wins.
+    assert by_source.loc[7, 'Mini_Grid'] == '5'
+    assert household_reliability(by_source)[7] == '0,1&2'
+
+
+def test_sources_match_notebook_loop():
+    rng = np.random.default_rng(0)
+    n = 2000
+    values = rng.choice([np.nan, 0, 1, 2, 3, 4, 10, 14, 15, 888],
+                        size=(n, len(OUTAGE_COLUMNS)))
+    durations = rng.choice([np.nan, 0.5, 1.5, 2, 2.5, 6, 888], size=(n, 4))
+    values[:, [2, 3, 6, 7]] = durations
+    outages = numeric_answers(pd.DataFrame(values, columns=OUTAGE_COLUMNS),
+                              OUTAGE_COLUMNS, dtype='float64')
+    by_source = reliability_by_source(outages)
+    for source, columns in RELIABILITY_COLUMNS.items():
+        # Worst month first, typical month when the worst is blank.
+        frequency, duration = (
+            outages[worst].fillna(outages[typical])
+            for worst, typical in (columns['frequency'],
+                                   columns['duration']))
+        expected = [notebook_reliability(f, d)
+                    for f, d in zip(frequency, duration)]
+        assert list(by_source[source]) == expected
+
+
+@pytest.mark.filterwarnings('ignore:columns not in the dataset')
+def test_rulebook_versions_use_their_own_outage_rules():
+    rulebooks = [compile_rulebook(version)
+                 for version in ('rwanda', 'mtf-electricity')]
+    tiers = evaluate(main_dataset(FIXTURE), rulebooks)
+    expected = pd.read_csv(FIXTURE, index_col=0, dtype={'expected': str})
+    assert list(tiers['rwanda', 'Reliability']) == list(expected['expected'])
+    # The national grid is used first; the duration is not looked at.
+    frequency = (expected['C29A'].replace(888, np.nan)
+                 .fillna(expected['C29B'])
+                 .fillna(expected['C71A']).fillna(expected['C71B']))
+    assert list(tiers['mtf-electricity', 'Reliability']) == [
+        frequency_reliability(value) for value in frequency]
@@ -0,0 +1,41 @@
+"""Cached report of the electricity book, weighted by P.csv."""
+
+import pandas as pd
+import pytest
+
+from mtf import report
+from mtf.index import access_index
+from mtf.weights import WEIGHT, tier_counts
+
+
+@pytest.fixture(scope='module')
+def entry(tmp_path_factory):
+    with pytest.warns(UserWarning, match='columns not in the dataset'):
+        return report.run(output=tmp_path_factory.mktemp('reports'),
+                          figures=False)
+
+
+def test_counts_are_weighted(entry):
+    tiers = report.load_report(entry.parent)
+    counts = pd.read_csv(entry / 'counts.csv', index_col=0)
+    assert tiers[WEIGHT].nunique() > 1
+    for column in counts.columns:
+        weighted = tier_counts(tiers[column], tiers[WEIGHT]).reindex(
+            counts.index, fill_value=0)
+        unweighted = tier_counts(tiers[column]).reindex(counts.index,
+                                                        fill_value=0)
+        assert counts[column].to_numpy() == pytest.approx(
+            weighted.to_numpy())
+        assert (counts[column] != unweighted).any()
+
+
+def test_manifest_index_is_weighted(entry):
+    tiers = report.load_report(entry.parent)
+    manifest = report.load_manifest(entry.parent)
+    index = manifest['access_index']
+    attributes = manifest['attributes']
+    assert index['index'] == pytest.approx(
+        access_index(tiers[attributes + [WEIGHT]]))
+    assert index['index'] != pytest.approx(access_index(tiers[attributes]))
+    assert index['low'] <= index['index'] <= index['high']
+    assert index['bounds'][0] == pytest.approx(index['index'])
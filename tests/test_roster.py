@@ -0,0 +1,41 @@
+"""Household features of the section A roster."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mtf.roster import FEATURES, household_features, join_features
+
+SECTION_A = Path(__file__).parent / 'data' / 'section_a.csv'
+
+
+def test_features_of_two_households():
+    features = household_features(pd.read_csv(SECTION_A, index_col=0))
+    assert list(features.columns) == FEATURES
+    assert list(features.index) == [10102, 20101]
+    assert list(features['Household_Size']) == [2, 4]
+    # The head is not the first member listed in household 20101.
+    assert list(features['Head_Sex']) == ['Female', 'Male']
+    assert list(features['Head_Age']) == [68, 40]
+    # A child and a grandparent for two members of working age; no member
+    # of working age in household 10102.
+    np.testing.assert_array_equal(features['Dependency_Ratio'], [np.nan, 1])
+
+
+def test_value_labels_give_the_same_features():
+    roster = pd.read_csv(SECTION_A, index_col=0)
+    labelled = roster.assign(
+        A3=roster['A3'].map({1: 'Male', 2: 'Female'}).astype('category'),
+        A4=roster['A4'].map({1: 'Head', 2: 'Spouse', 3: 'Child',
+                             5: 'Parent'}).astype('category'))
+    pd.testing.assert_frame_equal(household_features(labelled),
+                                  household_features(roster))
+
+
+def test_join_features_on_tier_rows():
+    features = household_features(pd.read_csv(SECTION_A, index_col=0))
+    tiers = pd.DataFrame({'Capacity': ['1', '3', '0']})
+    joined = join_features(tiers, features, households=[20101, 99999, 10102])
+    assert list(joined.index) == [0, 1, 2]
+    assert list(joined['Household_Size'].fillna(0)) == [4, 0, 2]
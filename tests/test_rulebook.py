@@ -0,0 +1,40 @@
+"""Compiled rulebooks and their cache."""
+
+import pandas as pd
+import pytest
+
+from mtf import rulebook
+from mtf.electricity import ATTRIBUTE_COLUMNS, ATTRIBUTES
+from mtf.rulebook import Rulebook, compile_rulebook, load_rulebook
+from mtf.tiers import DAY_AVAILABILITY_TIERS
+
+
+def test_questions_of_the_spreadsheet():
+    compiled = compile_rulebook('rwanda')
+    assert list(compiled.tables) == ATTRIBUTES
+    # Worst and typical month questions are told apart.
+    assert {'C26A', 'C26B', 'C127'} <= set(compiled.columns('Availability'))
+    assert compiled.inputs == ATTRIBUTE_COLUMNS
+    assert compiled.unused() == []
+
+
+def test_compile_and_load_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(rulebook, 'RULEBOOK_DIR', tmp_path)
+    compiled = load_rulebook('rwanda')
+    assert len(list(tmp_path.glob('rwanda.*.pkl'))) == 1
+
+    def recompile(version):
+        raise AssertionError('compiled again: %s' % version)
+
+    monkeypatch.setattr(rulebook, 'compile_rulebook', recompile)
+    cached = load_rulebook(country='Rwanda')
+    assert cached.version == compiled.version
+    assert repr(cached.tables) == repr(compiled.tables)
+    assert cached.inputs == compiled.inputs
+    pd.testing.assert_frame_equal(cached.indicators, compiled.indicators)
+
+
+def test_tables_need_questions():
+    indicators = compile_rulebook('rwanda').indicators
+    with pytest.raises(ValueError, match='without questions: Lighting'):
+        Rulebook('test', indicators, {'Lighting': DAY_AVAILABILITY_TIERS})
@@ -0,0 +1,41 @@
+"""Solar devices of section C joined into the electricity sources."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.electricity import electricity_tiers
+from mtf.solar import solar_sources
+
+#: Two panels of household 2, one unrated device of household 3.
+DEVICES = pd.DataFrame({'HHID': [2, 2, 3],
+                        'C151': [60, 40, np.nan],
+                        'C166': [5, 8, 2],
+                        'C167': [2, np.nan, 1]})
+
+HOUSEHOLDS = pd.DataFrame({'HHID': [1, 2], 'C22': [0.5, 0.5]})
+
+
+def test_solar_sources_one_row_per_household():
+    solar = solar_sources(DEVICES)
+    assert list(solar.index) == [2, 3]
+    # 100 W at 4 sun hours, as monthly kWh.
+    assert solar.loc[2, 'Solar_Panel'] == pytest.approx(12)
+    assert np.isnan(solar.loc[3, 'Solar_Panel'])
+    assert list(solar['Solar_Day']) == [8, 2]
+
+
+@pytest.mark.filterwarnings('ignore:columns not in the dataset')
+def test_solar_panel_raises_capacity_tier():
+    without = electricity_tiers(HOUSEHOLDS)
+    tiers = electricity_tiers(HOUSEHOLDS, solar=solar_sources(DEVICES))
+    # 0.5 kWh a month is 17 Wh a day, 400 Wh more with the panels.
+    assert list(without['Capacity']) == ['1', '1']
+    assert list(tiers['Capacity']) == ['1', '2']
+
+
+@pytest.mark.filterwarnings('ignore:columns not in the dataset')
+def test_solar_without_matching_household_raises():
+    rows = HOUSEHOLDS.drop(columns='HHID')
+    with pytest.raises(ValueError, match='solar device'):
+        electricity_tiers(rows, solar=solar_sources(DEVICES))
@@ -0,0 +1,127 @@
+"""Source policies of capacity, availability and reliability."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.electricity import (ATTRIBUTE_COLUMNS, ATTRIBUTES,
+                             RELIABILITY_TIERS, electricity_indicators,
+                             electricity_tiers, household_reliability,
+                             seasonal_indicators)
+from mtf.sources import MONTHS, coalesce_months, combine_sources
+
+
+def answers(rows):
+    """Main dataset rows: every input column, blank unless given."""
+    columns = [column for attribute in ATTRIBUTES
+               for column in ATTRIBUTE_COLUMNS[attribute]]
+    df = pd.DataFrame(np.nan, index=range(len(rows)), columns=columns,
+                      dtype=object)
+    for row, values in enumerate(rows):
+        for column, value in values.items():
+            df.loc[row, column] = value
+    return df
+
+
+# National grid: 2 outages of 1 hour (tier 5); mini grid: 10 outages of 3
+# hours (tier 3&4).
+GRIDS = {'C29A': 2, 'C30A': 1, 'C71A': 10, 'C72A': 3}
+
+HOUSEHOLDS = answers([
+    dict(GRIDS, C26A=6, C68A=20),   # mini grid supplies most hours
+    dict(GRIDS, C26A=20, C68A=6),   # national grid supplies most hours
+    dict(GRIDS, C26A=2, C68A=3, C107A=12),  # generator supplies most
+])
+
+
+def test_sum_uses_national_grid_reliability():
+    tiers = electricity_tiers(HOUSEHOLDS)
+    assert list(tiers['Reliability']) == ['5', '5', '5']
+    assert list(tiers['Availability']) == ['5', '5', '4']
+
+
+def test_primary_reliability_follows_primary_source():
+    tiers = electricity_tiers(HOUSEHOLDS, policy='primary')
+    assert list(tiers['Reliability']) == ['3&4', '5', 'Missing_data']
+    assert list(tiers['Availability']) == ['4', '4', '3']
+
+
+def test_max_reliability_is_best_grid():
+    tiers = electricity_tiers(HOUSEHOLDS, policy='max')
+    assert list(tiers['Reliability']) == ['5', '5', '5']
+
+
+def test_household_reliability_policies():
+    # National grid: blank, 10 outages of 3 hours (3&4) twice; mini grid:
+    # 2 outages of 1 hour (5) twice, then blank.
+    by_source = pd.DataFrame({
+        'National_Grid': RELIABILITY_TIERS.classify([np.nan, 10, 10],
+                                                    [np.nan, 3, 3]),
+        'Mini_Grid': RELIABILITY_TIERS.classify([2, 2, np.nan],
+                                                [1, 1, np.nan]),
+    })
+    assert list(household_reliability(by_source)) == ['5', '3&4', '3&4']
+    assert list(household_reliability(by_source, 'max')) == [
+        '5', '5', '3&4']
+    assert list(household_reliability(by_source, 'primary',
+                                      np.array([1, 1, -1]))) == [
+        '5', '5', 'Missing_data']
+    # Tiers are not added up.
+    with pytest.raises(ValueError, match='first, primary, max'):
+        household_reliability(by_source, 'sum')
+
+
+def test_combine_sources_policies():
+    matrix = np.array([[20, 6, np.nan], [np.nan, np.nan, np.nan]])
+    np.testing.assert_array_equal(combine_sources(matrix, 'sum'),
+                                  [26, np.nan])
+    np.testing.assert_array_equal(combine_sources(matrix, 'max'),
+                                  [20, np.nan])
+    np.testing.assert_array_equal(
+        combine_sources(matrix, 'primary', np.array([1, -1])), [6, np.nan])
+    with pytest.raises(ValueError):
+        combine_sources(matrix, 'capped')
+
+
+# Worst, typical and fallback answers of three sources; the battery is
+# asked once and the solar device falls back on a third column.
+MONTH_ANSWERS = pd.DataFrame({
+    'W1': [2, np.nan, np.nan, np.nan],
+    'T1': [5, 6, np.nan, np.nan],
+    'W2': [1, np.nan, 3, np.nan],
+    'W3': [np.nan, 4, np.nan, np.nan],
+    'T3': [7, np.nan, np.nan, 8],
+    'F3': [9, 9, 9, np.nan],
+})
+MONTH_PAIRS = [('W1', 'T1'), ('W2', None), ('W3', 'T3', 'F3')]
+
+
+def test_coalesce_months_order():
+    np.testing.assert_array_equal(
+        coalesce_months(MONTH_ANSWERS, MONTH_PAIRS, 'worst'),
+        [[2, 1, 7], [6, np.nan, 4], [np.nan, 3, 9], [np.nan, np.nan, 8]])
+    np.testing.assert_array_equal(
+        coalesce_months(MONTH_ANSWERS, MONTH_PAIRS, 'typical'),
+        [[5, 1, 7], [6, np.nan, 4], [np.nan, 3, 9], [np.nan, np.nan, 8]])
+    with pytest.raises(ValueError):
+        coalesce_months(MONTH_ANSWERS, MONTH_PAIRS, 'best')
+
+
+def test_coalesce_both_months_is_both_scenarios():
+    both = coalesce_months(MONTH_ANSWERS, MONTH_PAIRS, 'both')
+    assert both.shape == (len(MONTHS),) + (len(MONTH_ANSWERS),
+                                          len(MONTH_PAIRS))
+    for scenario, month in zip(both, MONTHS):
+        np.testing.assert_array_equal(
+            scenario, coalesce_months(MONTH_ANSWERS, MONTH_PAIRS, month))
+
+
+def test_seasonal_indicators_are_both_months():
+    rows = answers([
+        dict(GRIDS, C26A=6, C26B=20, C27B=3),
+        dict(C26B=12, C68A=2, C68B=8, C29A=20, C29B=2, C30B=1),
+    ])
+    seasonal = seasonal_indicators(rows)
+    for month in MONTHS:
+        pd.testing.assert_frame_equal(
+            seasonal[month], electricity_indicators(rows, month=month))
@@ -0,0 +1,69 @@
+"""Chunked tiers against the in-memory tier table."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.data import main_dataset
+from mtf.electricity import ATTRIBUTES, electricity_tiers
+from mtf.index import access_index
+from mtf.stream import stream_tiers, summarise
+from mtf.weights import tier_counts
+
+FIXTURE = Path(__file__).parent / 'data' / 'capacity.csv'
+
+#: HHID of the rows of the fixture, which has no HHID column.
+HOUSEHOLDS = pd.Index([101, 102, 103, 105, 108, 113], name='HHID')
+
+WEIGHTS = pd.Series([1.5, 2, 0.5, 3, 1, 2.5], index=HOUSEHOLDS)
+
+
+@pytest.fixture
+def tiers():
+    with pytest.warns(UserWarning, match='columns not in the dataset'):
+        return electricity_tiers(main_dataset(FIXTURE),
+                                 households=HOUSEHOLDS)
+
+
+@pytest.fixture
+def total():
+    # Chunks of 4 households: one full chunk and a partial one.
+    with pytest.warns(UserWarning, match='columns not in the dataset'):
+        return summarise(FIXTURE, chunksize=4, weights=WEIGHTS,
+                         households=HOUSEHOLDS)
+
+
+def test_chunks_are_the_in_memory_tiers(tiers):
+    with pytest.warns(UserWarning, match='columns not in the dataset'):
+        chunks = list(stream_tiers(FIXTURE, chunksize=4,
+                                   households=HOUSEHOLDS))
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), tiers)
+
+
+def test_counts_match_tier_counts(tiers, total):
+    assert total.households == len(HOUSEHOLDS)
+    for weighted, weights in ((False, None), (True, WEIGHTS)):
+        counts = total.counts(weighted)
+        for attribute in ATTRIBUTES:
+            expected = tier_counts(tiers[attribute], weights)
+            np.testing.assert_array_equal(
+                counts[attribute].reindex(expected.index, fill_value=0),
+                expected)
+
+
+def test_access_index_matches_in_memory(tiers, total):
+    assert total.access_index() == pytest.approx(
+        access_index(tiers[ATTRIBUTES]))
+    assert total.access_index(weighted=True) == pytest.approx(
+        access_index(tiers[ATTRIBUTES], weights=WEIGHTS))
+
+
+@pytest.mark.filterwarnings('ignore:columns not in the dataset')
+@pytest.mark.parametrize('households', [HOUSEHOLDS[:5],
+                                        HOUSEHOLDS.append(pd.Index([121]))])
+def test_households_must_match_the_rows(households):
+    with pytest.raises(ValueError, match='households has'):
+        list(stream_tiers(FIXTURE, chunksize=4, households=households))
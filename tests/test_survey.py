@@ -0,0 +1,54 @@
+"""Survey-weighted tier shares by group."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.survey import geography, household_weights, weighted_shares
+from mtf.tiers import DAY_AVAILABILITY_TIERS, MISSING
+
+#: Two households of Kigali City (district 11) and two of the Southern
+#: province (district 21).
+HOUSEHOLDS = pd.Index([110203, 110415, 210107, 210932], name='HHID')
+
+TIERS = pd.DataFrame({
+    'Availability': DAY_AVAILABILITY_TIERS.classify(
+        pd.Series([5, 20, 5, np.nan], index=HOUSEHOLDS)),
+})
+
+WEIGHTS = pd.Series([1, 3, 2, 2], index=HOUSEHOLDS)
+
+
+def test_household_weights_keep_the_first_row():
+    section = pd.DataFrame({'HHID': [210107, 110203, 110203],
+                            'sample_weight': [2.5, 1.5, 9]})
+    weights = household_weights(section)
+    assert weights.to_dict() == {110203: 1.5, 210107: 2.5}
+
+
+def test_geography_from_hhid():
+    places = geography(HOUSEHOLDS)
+    assert list(places['Province']) == ['Kigali City', 'Kigali City',
+                                        'Southern', 'Southern']
+    assert list(places['District']) == [11, 11, 21, 21]
+
+
+def test_weighted_national_shares():
+    shares = weighted_shares(TIERS, WEIGHTS)['share']
+    assert shares[('Availability', '1&2')] == pytest.approx(3 / 8)
+    assert shares[('Availability', '4')] == pytest.approx(3 / 8)
+    assert shares[('Availability', MISSING)] == pytest.approx(2 / 8)
+    assessed = weighted_shares(TIERS, WEIGHTS, missing=False)['share']
+    assert MISSING not in assessed.index.get_level_values('tier')
+    assert assessed[('Availability', '4')] == pytest.approx(0.5)
+
+
+def test_weighted_shares_by_province():
+    shares = weighted_shares(TIERS, WEIGHTS,
+                             by=geography(HOUSEHOLDS)['Province'])['share']
+    kigali, southern = shares['Kigali City'], shares['Southern']
+    assert kigali[('Availability', '1&2')] == pytest.approx(1 / 4)
+    assert kigali[('Availability', '4')] == pytest.approx(3 / 4)
+    assert southern[('Availability', MISSING)] == pytest.approx(1 / 2)
+    np.testing.assert_allclose(
+        shares.groupby(level=['Province', 'attribute']).sum(), 1)
@@ -0,0 +1,55 @@
+"""Tier tables and tier labels."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.electricity import QUALITY_TIERS
+from mtf.tiers import (CAPACITY_TIERS, DAY_AVAILABILITY_TIERS,
+                       EVENING_AVAILABILITY_TIERS, MISSING, TierTable,
+                       tier_ceiling, tier_floor, tier_midpoint, tier_range)
+
+
+def test_bins_are_half_open():
+    values = pd.Series([0, 11.99, 12, 199.9, 200, 1000, 3400, 8199, 8200,
+                        np.nan], index=list('abcdefghij'))
+    tiers = CAPACITY_TIERS.classify(values)
+    assert list(tiers.index) == list(values.index)
+    assert list(tiers) == ['0', '0', '1', '1', '2', '3', '4', '4', '5',
+                           MISSING]
+
+
+def test_shared_tiers_and_missing_values():
+    tiers = DAY_AVAILABILITY_TIERS.classify([3.9, 4, 7.5, 8, 22, 23])
+    assert list(tiers) == ['0', '1&2', '1&2', '3', '4', '5']
+    # No hour of evening supply is reported as missing.
+    assert list(EVENING_AVAILABILITY_TIERS.categories)[-1] == MISSING
+    assert EVENING_AVAILABILITY_TIERS.classify([0])[0] == MISSING
+    # Answers that are not numbers are missing.
+    assert list(CAPACITY_TIERS.classify(['15', "Don't know", None])) == [
+        '1', MISSING, MISSING]
+
+
+def test_table_checks_its_edges():
+    with pytest.raises(ValueError, match='needs 3 labels'):
+        TierTable([1, 2], ['0', '1'])
+    with pytest.raises(ValueError, match='sorted'):
+        TierTable([2, 1], ['0', '1', '2'])
+
+
+def test_code_table():
+    answers = ['Yes', 1, 'No', "Don't know", 888, np.nan]
+    assert list(QUALITY_TIERS.classify(answers)) == [
+        '0,1,2&3', '0,1,2&3', '4&5', MISSING, MISSING, MISSING]
+    assert QUALITY_TIERS.categories == ['0,1,2&3', '4&5', MISSING]
+
+
+def test_tier_range_of_composite_labels():
+    tiers = pd.Categorical(['3&4', '0,1,2&3', '2', MISSING, np.nan, '4&5'])
+    lower, upper = tier_range(tiers)
+    np.testing.assert_array_equal(lower, [3, 0, 2, -1, -1, 4])
+    np.testing.assert_array_equal(upper, [4, 3, 2, -1, -1, 5])
+    np.testing.assert_array_equal(tier_floor(tiers), lower)
+    np.testing.assert_array_equal(tier_ceiling(tiers), upper)
+    np.testing.assert_array_equal(tier_midpoint(tiers),
+                                  [3.5, 1.5, 2, np.nan, np.nan, 4.5])
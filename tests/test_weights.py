@@ -0,0 +1,48 @@
+"""Sampling weights of the households."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mtf.weights import (WEIGHT, WeightIndex, attach_weights, load_weights,
+                         tier_counts)
+
+SECTION_P = pd.DataFrame({'HHID': [30512, 10101, 10101, 20733],
+                          'sample_weight': [4.0, 1.5, 1.5, 2.25]})
+
+
+def test_lookup_by_hhid():
+    index = WeightIndex.from_section(SECTION_P)
+    assert len(index) == 3
+    # Unknown, blank and out of range HHIDs have no weight.
+    np.testing.assert_array_equal(
+        index.lookup([20733, 10101, 99999, np.nan, 1, 30512]),
+        [2.25, 1.5, np.nan, np.nan, np.nan, 4.0])
+    assert index.as_series().to_dict() == {10101: 1.5, 20733: 2.25,
+                                           30512: 4.0}
+
+
+def test_load_weights_round_trip(tmp_path):
+    path = tmp_path / 'P.csv'
+    SECTION_P.to_csv(path)
+    first = load_weights(path)
+    assert list(tmp_path.glob('.mtf_cache/P.*.weights.npz'))
+    cached = load_weights(path)
+    np.testing.assert_array_equal(cached.households, first.households)
+    np.testing.assert_array_equal(cached.weights, first.weights)
+
+
+def test_attach_weights():
+    tiers = pd.DataFrame({'Capacity': ['1', '2', '5']},
+                         index=[10101, 30512, 40404])
+    for weights in (WeightIndex.from_section(SECTION_P),
+                    WeightIndex.from_section(SECTION_P).as_series()):
+        weighted = attach_weights(tiers, weights)
+        np.testing.assert_array_equal(weighted[WEIGHT], [1.5, 4.0, np.nan])
+    with pytest.warns(UserWarning, match='1 of 3 households have no weight'):
+        counts = tier_counts(weighted['Capacity'], weighted[WEIGHT])
+    assert counts.to_dict() == {'1': 1.5, '2': 4.0, '5': 0.0}
+    # Rows numbered rather than identified by HHID.
+    with pytest.raises(ValueError, match='none of the 3 households'):
+        attach_weights(tiers.reset_index(drop=True),
+                       WeightIndex.from_section(SECTION_P))